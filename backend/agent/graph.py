@@ -230,10 +230,10 @@ Mark your final conclusion with "**Conclusion:**" """
     
     # Add memory context if available
     if state['memories']:
-        memory_context = "\n=== Relevant Past Insights ===\n"
-        for mem in state['memories']:
-            memory_context += f"• {mem.get('content', '')}\n"
-        memory_context += "=== End Insights ===\n"
+        memory_lines = ["\n=== Relevant Past Insights ==="]
+        memory_lines.extend(f"• {mem.get('content', '')}" for mem in state['memories'])
+        memory_lines.append("=== End Insights ===\n")
+        memory_context = "\n".join(memory_lines)
         messages.append({"role": "system", "content": memory_context})
     
     # Add conversation history
@@ -93,11 +93,11 @@ Provide a concise summary (2-3 sentences) capturing the most important insights.
             return None
         
         # Format conversation
-        conversation_text = ""
-        for msg in messages:
-            role = msg.get('role', 'unknown')
-            content = msg.get('content', '')[:500]  # Truncate long messages
-            conversation_text += f"{role.upper()}: {content}\n\n"
+        conversation_text = "".join(
+            # Truncate long messages
+            f"{msg.get('role', 'unknown').upper()}: {msg.get('content', '')[:500]}\n\n"
+            for msg in messages
+        )
         
         prompt = self.SUMMARIZE_PROMPT.format(conversation=conversation_text)
         
@@ -59,6 +59,13 @@ def create_app(config_name: str = None) -> Flask:
     # Create upload directory
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # Load ingestion and retrieval models at startup instead of on first use
+    if os.getenv('WARMUP_ON_START') == '1':
+        from services.ingestion import get_ingestion_service
+        from services.retrieval import get_retrieval_service
+        get_ingestion_service()
+        get_retrieval_service()
+    
     # Create database tables (for development)
     with app.app_context():
         # Don't create tables automatically in production
@@ -70,9 +77,14 @@ def create_app(config_name: str = None) -> Flask:
 
 def init_extensions(app: Flask) -> None:
     """Initialize Flask extensions."""
+    from utils.auth_utils import init_auth
+    
     # SQLAlchemy
     db.init_app(app)
     
+    # JWT settings
+    init_auth(app)
+    
     # CORS
     CORS(app, 
          origins=app.config['CORS_ORIGINS'],
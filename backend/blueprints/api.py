@@ -21,6 +21,7 @@ from database.models import (
     ChatSession, 
     ChatMessage, 
     MessageRole,
+    isoformat_utc,
     get_user_sessions,
     get_session_messages
 )
@@ -90,7 +91,7 @@ def save_api_key():
             # Update existing key
             existing_key.api_key = api_key
             existing_key.is_active = True
-            existing_key.updated_at = datetime.now()
+            existing_key.updated_at = datetime.utcnow()
             message = f"API key for {provider} updated successfully"
         else:
             # Create new key
@@ -139,8 +140,8 @@ def get_api_keys():
             'provider': key.provider,
             'api_key_masked': masked_key,
             'is_active': key.is_active,
-            'created_at': key.created_at.isoformat(),
-            'updated_at': key.updated_at.isoformat()
+            'created_at': isoformat_utc(key.created_at),
+            'updated_at': isoformat_utc(key.updated_at)
         })
     
     return success_response(data=key_list)
@@ -263,8 +264,8 @@ def get_chat_history():
             'title': session.title,
             'message_count': message_count,
             'preview': preview,
-            'created_at': session.created_at.isoformat(),
-            'last_active_at': session.last_active_at.isoformat()
+            'created_at': isoformat_utc(session.created_at),
+            'last_active_at': isoformat_utc(session.last_active_at)
         })
     
     return paginated_response(
@@ -321,7 +322,7 @@ def create_chat_session():
             data={
                 'id': session.id,
                 'title': session.title,
-                'created_at': session.created_at.isoformat()
+                'created_at': isoformat_utc(session.created_at)
             },
             message="Chat session created",
             status_code=201
@@ -364,8 +365,8 @@ def get_chat_session(session_id: int):
             'session': {
                 'id': session.id,
                 'title': session.title,
-                'created_at': session.created_at.isoformat(),
-                'last_active_at': session.last_active_at.isoformat()
+                'created_at': isoformat_utc(session.created_at),
+                'last_active_at': isoformat_utc(session.last_active_at)
             },
             'messages': [msg.to_dict() for msg in messages]
         }
@@ -15,7 +15,7 @@ from datetime import datetime
 from flask import Blueprint, request, g
 
 from database import db
-from database.models import User
+from database.models import User, isoformat_utc
 from utils.auth_utils import (
     generate_tokens, 
     token_required, 
@@ -100,7 +100,7 @@ def register():
                 'user': {
                     'id': user.id,
                     'username': user.username,
-                    'created_at': user.created_at.isoformat()
+                    'created_at': isoformat_utc(user.created_at)
                 },
                 'access_token': access_token,
                 'refresh_token': refresh_token
@@ -155,7 +155,7 @@ def login():
             'user': {
                 'id': user.id,
                 'username': user.username,
-                'created_at': user.created_at.isoformat()
+                'created_at': isoformat_utc(user.created_at)
             },
             'access_token': access_token,
             'refresh_token': refresh_token
@@ -220,7 +220,7 @@ def get_current_user():
         data={
             'id': user.id,
             'username': user.username,
-            'created_at': user.created_at.isoformat()
+            'created_at': isoformat_utc(user.created_at)
         }
     )
 
@@ -16,7 +16,7 @@ from werkzeug.utils import secure_filename
 from flask import Blueprint, request, g, current_app, send_from_directory
 
 from database import db
-from database.models import FileDocument, ParsingStatus
+from database.models import FileDocument, ParsingStatus, isoformat_utc
 from utils.auth_utils import token_required
 from utils.response import success_response, error_response, paginated_response
 
@@ -82,7 +82,7 @@ def upload_file():
         safe_filename = secure_filename(file.filename)
         
         # Add timestamp to avoid collisions
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         unique_filename = f"{timestamp}_{safe_filename}"
         
         # Get user upload directory
@@ -274,7 +274,7 @@ def get_file_status(doc_id: int):
             'parsing_status': document.parsing_status.value,
             'parsing_error': document.parsing_error,
             'chunk_count': document.chunk_count,
-            'parsed_at': document.parsed_at.isoformat() if document.parsed_at else None
+            'parsed_at': isoformat_utc(document.parsed_at)
         }
     )
 
@@ -0,0 +1,18 @@
+-- ============================================================================
+-- Extend api_keys index to cover is_active
+-- 将 is_active 加入 api_keys 复合索引，活跃密钥查询可直接走索引定位
+-- ============================================================================
+
+USE knowledge_base_db;
+
+-- Step 1: 用 (user_id, provider, is_active) 替换旧的 (user_id, provider) 索引
+ALTER TABLE api_keys
+    DROP INDEX idx_user_provider,
+    ADD INDEX idx_user_provider_active (user_id, provider, is_active);
+
+-- Step 2: 验证修改
+SHOW INDEX FROM api_keys;
+
+-- Step 3: 确认活跃密钥查询使用新索引
+EXPLAIN SELECT * FROM api_keys
+WHERE user_id = 1 AND provider = 'qwen' AND is_active = TRUE;
@@ -14,10 +14,12 @@ All operations enforce user_id isolation for data privacy.
 """
 
 import os
+import itertools
 import threading
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Union
+from datetime import datetime, timezone
 
+import numpy as np
 import chromadb
 from chromadb.config import Settings
 
@@ -98,6 +100,11 @@ class ChromaDBClient:
             # Initialize collections
             self._init_collections()
             
+            # Knowledge base change tracking (see knowledge_base_version)
+            self._kb_change_counter = itertools.count(1)
+            self._kb_versions: Dict[int, int] = {}
+            self._kb_reset_version = 0
+            
             ChromaDBClient._initialized = True
     
     def _init_collections(self) -> None:
@@ -144,9 +151,10 @@ class ChromaDBClient:
         user_id: int,
         doc_id: int,
         chunks: List[str],
-        embeddings: List[List[float]],
+        embeddings: Union[List[List[float]], np.ndarray],
         metadatas: List[Dict[str, Any]] = None,
-        source: str = None
+        source: str = None,
+        start_index: int = 0
     ) -> List[str]:
         """
         Add document chunks to the knowledge base.
@@ -155,18 +163,24 @@ class ChromaDBClient:
             user_id: User ID for data isolation
             doc_id: Document ID from FileDocument table
             chunks: List of text chunks
-            embeddings: List of embedding vectors
+            embeddings: Embedding vectors (a float32 ndarray is passed to
+                        ChromaDB as-is, without a list round-trip)
             metadatas: Optional list of additional metadata per chunk
             source: Source filename
+            start_index: Index of the first chunk within the document, so
+                         callers adding a document in several batches get
+                         unique, contiguous chunk IDs
             
         Returns:
             List of generated chunk IDs
         """
         chunk_ids = []
         full_metadatas = []
+        now = datetime.now(timezone.utc).isoformat()
         
         for i, chunk in enumerate(chunks):
-            chunk_id = f"user_{user_id}_doc_{doc_id}_chunk_{i}"
+            chunk_index = start_index + i
+            chunk_id = f"user_{user_id}_doc_{doc_id}_chunk_{chunk_index}"
             chunk_ids.append(chunk_id)
             
             # Build metadata with user isolation
@@ -174,8 +188,8 @@ class ChromaDBClient:
                 "user_id": user_id,
                 "doc_id": doc_id,
                 "source": source or f"document_{doc_id}",
-                "chunk_index": i,
-                "created_at": datetime.now().isoformat()
+                "chunk_index": chunk_index,
+                "created_at": now
             }
             
             # Merge additional metadata if provided
@@ -190,13 +204,14 @@ class ChromaDBClient:
             documents=chunks,
             metadatas=full_metadatas
         )
+        self._bump_knowledge_base_version(user_id)
         
         return chunk_ids
     
     def query_knowledge_base(
         self,
         user_id: int,
-        query_embedding: List[float],
+        query_embedding: Union[List[float], np.ndarray],
         n_results: int = 5,
         doc_ids: List[int] = None
     ) -> Dict[str, Any]:
@@ -212,6 +227,33 @@ class ChromaDBClient:
         Returns:
             Query results with documents, distances, and metadata
         """
+        return self.query_knowledge_base_batch(
+            user_id=user_id,
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            doc_ids=doc_ids
+        )
+    
+    def query_knowledge_base_batch(
+        self,
+        user_id: int,
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        n_results: int = 5,
+        doc_ids: List[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Query the knowledge base with several embeddings in one call.
+        
+        Args:
+            user_id: User ID for filtering
+            query_embeddings: Query embedding vectors
+            n_results: Number of results to return per query
+            doc_ids: Optional list of doc_ids to filter by
+            
+        Returns:
+            Query results with one list of documents, distances, and
+            metadata per query embedding
+        """
         # Build where clause for user isolation
         where_clause = {"user_id": user_id}
         
@@ -225,7 +267,7 @@ class ChromaDBClient:
             }
         
         results = self._knowledge_base.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=n_results,
             where=where_clause,
             include=["documents", "metadatas", "distances"]
@@ -249,6 +291,7 @@ class ChromaDBClient:
                 ]
             }
         )
+        self._bump_knowledge_base_version(user_id)
     
     def delete_user_documents(self, user_id: int) -> None:
         """
@@ -260,6 +303,18 @@ class ChromaDBClient:
         self._knowledge_base.delete(
             where={"user_id": user_id}
         )
+        self._bump_knowledge_base_version(user_id)
+    
+    def knowledge_base_version(self, user_id: int) -> int:
+        """
+        Value that changes whenever the user's knowledge base changes in
+        this process. Lets callers cache query results per version.
+        """
+        return max(self._kb_versions.get(user_id, 0), self._kb_reset_version)
+    
+    def _bump_knowledge_base_version(self, user_id: int) -> None:
+        # Values come from one increasing counter, so they never repeat
+        self._kb_versions[user_id] = next(self._kb_change_counter)
     
     def get_document_chunk_count(self, user_id: int, doc_id: int = None) -> int:
         """
@@ -313,7 +368,8 @@ class ChromaDBClient:
         Returns:
             Generated memory ID
         """
-        memory_id = f"user_{user_id}_session_{session_id}_memory_{datetime.now().timestamp()}"
+        now = datetime.now(timezone.utc)
+        memory_id = f"user_{user_id}_session_{session_id}_memory_{now.timestamp()}"
         
         self._long_term_memory.add(
             ids=[memory_id],
@@ -322,9 +378,9 @@ class ChromaDBClient:
             metadatas=[{
                 "user_id": user_id,
                 "session_id": session_id,
-                "date": datetime.now().strftime("%Y-%m-%d"),
+                "date": now.strftime("%Y-%m-%d"),
                 "memory_type": memory_type,
-                "created_at": datetime.now().isoformat()
+                "created_at": now.isoformat()
             }]
         )
         
@@ -333,7 +389,7 @@ class ChromaDBClient:
     def query_memories(
         self,
         user_id: int,
-        query_embedding: List[float],
+        query_embedding: Union[List[float], np.ndarray],
         n_results: int = 5,
         memory_type: str = None
     ) -> Dict[str, Any]:
@@ -427,6 +483,7 @@ class ChromaDBClient:
         self._client.delete_collection(self.KNOWLEDGE_BASE_COLLECTION)
         self._client.delete_collection(self.LONG_TERM_MEMORY_COLLECTION)
         self._init_collections()
+        self._kb_reset_version = next(self._kb_change_counter)
     
     @classmethod
     def reset_instance(cls) -> None:
@@ -5,6 +5,11 @@ This module defines all relational data models for the Personal Federated
 Learning Knowledge Base Agent. All models enforce user_id isolation to ensure 
 data privacy between users.
 
+All timestamp columns are stored as naive UTC datetimes and serialized
+with an explicit +00:00 offset (isoformat_utc). Databases written before
+the switch to UTC hold local times; convert them once with
+scripts/migrate_timestamps_to_utc.py.
+
 Models:
     - User: Core user authentication and profile
     - APIKey: Third-party API credentials (Qwen, DeepSeek)
@@ -13,8 +18,9 @@ Models:
     - ChatMessage: Individual messages within a session
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
+from typing import Optional
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import Index
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -22,6 +28,11 @@ from werkzeug.security import generate_password_hash, check_password_hash
 db = SQLAlchemy()
 
 
+def isoformat_utc(value: Optional[datetime]) -> Optional[str]:
+    """Serialize a naive UTC timestamp as ISO 8601 with an explicit offset."""
+    return value.replace(tzinfo=timezone.utc).isoformat() if value else None
+
+
 class ParsingStatus(Enum):
     """Enum for document parsing status."""
     PENDING = "pending"
@@ -52,7 +63,7 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(256), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     api_keys = db.relationship('APIKey', backref='user', lazy='dynamic', 
@@ -98,13 +109,15 @@ class APIKey(db.Model):
     provider = db.Column(db.String(50), nullable=False)  # 'qwen', 'deepseek'
     api_key = db.Column(db.String(512), nullable=False)  # Consider encryption
     is_active = db.Column(db.Boolean, default=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.now, 
-                           onupdate=datetime.now, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, 
+                           onupdate=datetime.utcnow, nullable=False)
     
-    # Composite unique constraint: one active key per provider per user
+    # Active-key lookups filter on (user_id, provider, is_active); keeping
+    # is_active as the trailing column turns them into a single index seek
+    # while still serving plain (user_id, provider) prefix lookups
     __table_args__ = (
-        Index('idx_user_provider', 'user_id', 'provider'),
+        Index('idx_user_provider_active', 'user_id', 'provider', 'is_active'),
     )
     
     def __repr__(self) -> str:
@@ -147,7 +160,7 @@ class FileDocument(db.Model):
     )
     parsing_error = db.Column(db.Text, nullable=True)  # Error message if failed
     chunk_count = db.Column(db.Integer, default=0)  # Number of chunks after parsing
-    upload_time = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    upload_time = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     parsed_at = db.Column(db.DateTime, nullable=True)
     
     # Index for common queries
@@ -164,8 +177,8 @@ class FileDocument(db.Model):
             'file_size': self.file_size,
             'parsing_status': self.parsing_status.value,
             'chunk_count': self.chunk_count,
-            'upload_time': self.upload_time.isoformat() if self.upload_time else None,
-            'parsed_at': self.parsed_at.isoformat() if self.parsed_at else None
+            'upload_time': isoformat_utc(self.upload_time),
+            'parsed_at': isoformat_utc(self.parsed_at)
         }
     
     def __repr__(self) -> str:
@@ -192,9 +205,9 @@ class ChatSession(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), 
                         nullable=False, index=True)
     title = db.Column(db.String(255), default='New Chat', nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
-    last_active_at = db.Column(db.DateTime, default=datetime.now, 
-                                onupdate=datetime.now, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_active_at = db.Column(db.DateTime, default=datetime.utcnow, 
+                                onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     messages = db.relationship('ChatMessage', backref='session', lazy='dynamic',
@@ -211,8 +224,8 @@ class ChatSession(db.Model):
         result = {
             'id': self.id,
             'title': self.title,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_active_at': self.last_active_at.isoformat() if self.last_active_at else None
+            'created_at': isoformat_utc(self.created_at),
+            'last_active_at': isoformat_utc(self.last_active_at)
         }
         if include_messages:
             result['messages'] = [msg.to_dict() for msg in self.messages.all()]
@@ -250,7 +263,7 @@ class ChatMessage(db.Model):
     is_deep_thought = db.Column(db.Boolean, default=False, nullable=False)
     thinking_content = db.Column(db.Text, nullable=True)  # Reasoning process
     tokens_used = db.Column(db.Integer, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     def to_dict(self) -> dict:
         """Convert model to dictionary for API responses."""
@@ -262,7 +275,7 @@ class ChatMessage(db.Model):
             'is_deep_thought': self.is_deep_thought,
             'thinking_content': self.thinking_content,
             'tokens_used': self.tokens_used,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': isoformat_utc(self.created_at)
         }
     
     def __repr__(self) -> str:
@@ -55,7 +55,7 @@ CREATE TABLE api_keys (
     
     -- Indexes
     INDEX idx_user_id (user_id),
-    INDEX idx_user_provider (user_id, provider)
+    INDEX idx_user_provider_active (user_id, provider, is_active)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ============================================================================
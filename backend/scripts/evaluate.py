@@ -14,34 +14,29 @@ Usage:
 
 import os
 import sys
-import json
+import asyncio
 import argparse
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+import orjson
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from datasets import Dataset
-from ragas import evaluate
-from ragas.metrics import (
-    faithfulness,
-    answer_relevancy,
-    context_precision,
-    context_recall,
-)
-from ragas.llms import LangchainLLMWrapper
-from ragas.embeddings import LangchainEmbeddingsWrapper
-from langchain_openai import ChatOpenAI
-from langchain_community.embeddings import HuggingFaceEmbeddings
-
 from flask import Flask
+from sqlalchemy import func, select
 from config import Config
 from database.models import db, ChatSession, ChatMessage, FileDocument, MessageRole
-from services.retrieval import RetrievalService
-from agent.graph import KnowledgeBaseAgent
+
+# Heavy dependencies (ragas, datasets, LangChain, torch via the retrieval
+# and agent services) are imported inside the functions that use them so
+# that CLI startup and --help stay fast.
+if TYPE_CHECKING:
+    from agent.graph import KnowledgeBaseAgent
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -98,49 +93,82 @@ def collect_evaluation_data_from_db(
     Returns:
         List of EvalSample objects
     """
+    from services.retrieval import RetrievalService
+    
     samples = []
     retrieval_service = RetrievalService()
     
-    # Get recent chat messages
-    sessions = ChatSession.query.filter_by(
-        user_id=user_id,
-        is_archived=False
-    ).order_by(ChatSession.last_active_at.desc()).limit(20).all()
-    
-    for session in sessions:
-        messages = ChatMessage.query.filter_by(
-            session_id=session.id
-        ).order_by(ChatMessage.created_at).all()
+    for question, answer in _fetch_user_ai_pairs(user_id, limit):
+        # Retrieve context for this question
+        result = retrieval_service.hybrid_retrieve(
+            query=question,
+            user_id=user_id,
+            top_k=5
+        )
         
-        # Pair user messages with AI responses
-        for i in range(len(messages) - 1):
-            if messages[i].role == MessageRole.USER and \
-               messages[i+1].role == MessageRole.AI:
-                
-                question = messages[i].content
-                answer = messages[i+1].content
-                
-                # Retrieve context for this question
-                result = retrieval_service.hybrid_retrieve(
-                    query=question,
-                    user_id=user_id,
-                    top_k=5
-                )
-                
-                contexts = result.get('documents', [])
-                
-                samples.append(EvalSample(
-                    question=question,
-                    answer=answer,
-                    contexts=contexts
-                ))
-                
-                if len(samples) >= limit:
-                    return samples
+        samples.append(EvalSample(
+            question=question,
+            answer=answer,
+            contexts=[d['text'] for d in result.get('documents', [])]
+        ))
     
     return samples
 
 
+def _fetch_user_ai_pairs(
+    user_id: int,
+    limit: int,
+    max_sessions: int = 20
+) -> List[Tuple[str, str]]:
+    """
+    Fetch (question, answer) pairs where a user message is immediately
+    followed by an AI message, from the user's most recent sessions.
+    
+    The pairing is done in SQL with LEAD() window functions so only the
+    matching pairs (not every message) are transferred.
+    """
+    recent_sessions = select(
+        ChatSession.id,
+        ChatSession.last_active_at
+    ).where(
+        ChatSession.user_id == user_id
+    ).order_by(
+        ChatSession.last_active_at.desc()
+    ).limit(max_sessions).subquery()
+    
+    window = {
+        'partition_by': ChatMessage.session_id,
+        'order_by': ChatMessage.created_at
+    }
+    ordered = select(
+        ChatMessage.session_id,
+        ChatMessage.created_at,
+        ChatMessage.role,
+        ChatMessage.content,
+        func.lead(ChatMessage.role, type_=ChatMessage.role.type).over(**window).label('next_role'),
+        func.lead(ChatMessage.content).over(**window).label('next_content')
+    ).join(
+        recent_sessions,
+        ChatMessage.session_id == recent_sessions.c.id
+    ).subquery()
+    
+    stmt = select(
+        ordered.c.content,
+        ordered.c.next_content
+    ).join(
+        recent_sessions,
+        ordered.c.session_id == recent_sessions.c.id
+    ).where(
+        ordered.c.role == MessageRole.USER,
+        ordered.c.next_role == MessageRole.AI
+    ).order_by(
+        recent_sessions.c.last_active_at.desc(),
+        ordered.c.created_at
+    ).limit(limit)
+    
+    return [tuple(row) for row in db.session.execute(stmt)]
+
+
 def load_evaluation_dataset(filepath: str) -> List[EvalSample]:
     """
     Load evaluation dataset from JSON file.
@@ -155,8 +183,8 @@ def load_evaluation_dataset(filepath: str) -> List[EvalSample]:
         }
     ]
     """
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(filepath, 'rb') as f:
+        data = orjson.loads(f.read())
     
     samples = []
     for item in data:
@@ -172,57 +200,123 @@ def load_evaluation_dataset(filepath: str) -> List[EvalSample]:
 
 def generate_evaluation_data(
     user_id: int,
-    agent: KnowledgeBaseAgent,
+    agent: 'KnowledgeBaseAgent',
     questions: List[str],
-    provider: str = "qwen"
+    provider: str = "qwen",
+    concurrency: int = 10
 ) -> List[EvalSample]:
     """
     Generate evaluation data by running agent on questions.
     
+    Agent and retrieval calls are I/O-bound, so questions are processed
+    concurrently (bounded by ``concurrency``) in worker threads. Each
+    question runs in its own session, so answers are single-turn and never
+    see another question's history.
+    
     Args:
         user_id: User ID
-        agent: KnowledgeBaseAgent instance
+        agent: KnowledgeBaseAgent instance (build it with
+               use_checkpointing=False; evaluation needs no thread state)
         questions: List of questions to evaluate
         provider: LLM provider
+        concurrency: Maximum number of questions in flight
         
     Returns:
-        List of EvalSample objects
+        List of EvalSample objects, in the same order as questions
     """
-    samples = []
-    retrieval_service = RetrievalService()
+    return asyncio.run(_generate_evaluation_data_async(
+        user_id=user_id,
+        agent=agent,
+        questions=questions,
+        provider=provider,
+        concurrency=concurrency
+    ))
+
+
+async def _generate_evaluation_data_async(
+    user_id: int,
+    agent: 'KnowledgeBaseAgent',
+    questions: List[str],
+    provider: str,
+    concurrency: int
+) -> List[EvalSample]:
+    """Run agent + retrieval per question with a semaphore-bounded gather."""
+    from services.retrieval import RetrievalService
     
-    for question in questions:
-        # Get answer from agent
-        result = agent.chat(
-            user_id=user_id,
-            session_id=0,  # Dummy session for evaluation
-            query=question,
-            provider=provider
-        )
-        
-        # Get retrieved contexts
-        retrieval_result = retrieval_service.hybrid_retrieve(
-            query=question,
-            user_id=user_id,
-            top_k=5
-        )
+    retrieval_service = RetrievalService()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def evaluate_question(index: int, question: str) -> EvalSample:
+        async with semaphore:
+            # Get answer from agent and retrieved contexts in parallel
+            result, retrieval_result = await asyncio.gather(
+                asyncio.to_thread(
+                    agent.chat,
+                    user_id=user_id,
+                    # Dummy per-question session (negative, so it never
+                    # matches a real one): separate checkpoint threads
+                    # and memory writes for concurrent questions
+                    session_id=-(index + 1),
+                    query=question,
+                    provider=provider
+                ),
+                asyncio.to_thread(
+                    retrieval_service.hybrid_retrieve,
+                    query=question,
+                    user_id=user_id,
+                    top_k=5
+                )
+            )
         
-        samples.append(EvalSample(
+        return EvalSample(
             question=question,
             answer=result.get('response', ''),
-            contexts=retrieval_result.get('documents', [])
-        ))
+            contexts=[d['text'] for d in retrieval_result.get('documents', [])]
+        )
     
-    return samples
+    return list(await asyncio.gather(
+        *(evaluate_question(i, q) for i, q in enumerate(questions))
+    ))
 
 
 # =============================================================================
 # RAGAS Evaluation
 # =============================================================================
 
+EVAL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=4)
+def _get_llm(model: str, base_url: str, api_key: Optional[str]):
+    """Build (and reuse) the judge LLM so its HTTP connection pool is shared."""
+    from langchain_openai import ChatOpenAI
+    
+    return ChatOpenAI(
+        model=model,
+        openai_api_key=api_key,
+        openai_api_base=base_url,
+        temperature=0
+    )
+
+
+@lru_cache(maxsize=4)
+def _get_embeddings(model_name: str, quantize: bool = True):
+    """Load (and reuse) the embedding model used for RAGAS scoring."""
+    if quantize:
+        try:
+            from scripts.quantized_embeddings import QuantizedEmbeddings
+            return QuantizedEmbeddings(model_name)
+        except ImportError:
+            logger.warning("optimum[onnxruntime] not installed, using FP32 embeddings")
+    
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
 def setup_ragas_evaluator(
     llm_provider: str = "deepseek",
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    quantize_embeddings: bool = True
 ) -> tuple:
     """
     Setup LLM and embeddings for RAGAS evaluation.
@@ -230,10 +324,15 @@ def setup_ragas_evaluator(
     Args:
         llm_provider: LLM provider to use for evaluation
         api_key: API key for the LLM
+        quantize_embeddings: Use the int8 ONNX embedding model when
+            optimum[onnxruntime] is installed
         
     Returns:
         Tuple of (llm, embeddings)
     """
+    from ragas.llms import LangchainLLMWrapper
+    from ragas.embeddings import LangchainEmbeddingsWrapper
+    
     # Default model and base_url
     model = "deepseek-chat"
     base_url = "https://api.deepseek.com/v1"
@@ -249,18 +348,8 @@ def setup_ragas_evaluator(
             base_url = "https://dashscope.aliyuncs.com/compatible-mode/v1"
             model = "qwen-plus"
     
-    # Setup LLM
-    llm = ChatOpenAI(
-        model=model,
-        openai_api_key=api_key,
-        openai_api_base=base_url,
-        temperature=0
-    )
-    
-    # Setup embeddings
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+    llm = _get_llm(model, base_url, api_key)
+    embeddings = _get_embeddings(EVAL_EMBEDDING_MODEL, quantize_embeddings)
     
     return (
         LangchainLLMWrapper(llm),
@@ -286,6 +375,16 @@ def run_ragas_evaluation(
     Returns:
         EvalResult with metrics and per-sample scores
     """
+    import numpy as np
+    from datasets import Dataset, Features, Sequence, Value
+    from ragas import evaluate
+    from ragas.metrics import (
+        faithfulness,
+        answer_relevancy,
+        context_precision,
+        context_recall,
+    )
+    
     logger.info(f"Running RAGAS evaluation on {len(samples)} samples")
     
     if metrics is None:
@@ -300,20 +399,26 @@ def run_ragas_evaluation(
     llm, embeddings = setup_ragas_evaluator(llm_provider, api_key)
     
     # Prepare dataset
-    eval_data = {
-        'question': [],
-        'answer': [],
-        'contexts': [],
-        'ground_truth': []
-    }
-    
-    for sample in samples:
-        eval_data['question'].append(sample.question)
-        eval_data['answer'].append(sample.answer)
-        eval_data['contexts'].append(sample.contexts)
-        eval_data['ground_truth'].append(sample.ground_truth or sample.answer)
-    
-    dataset = Dataset.from_dict(eval_data)
+    # Stream samples straight into Arrow columns; declaring the features
+    # up front skips schema inference.
+    def sample_rows():
+        for sample in samples:
+            yield {
+                'question': sample.question,
+                'answer': sample.answer,
+                'contexts': sample.contexts,
+                'ground_truth': sample.ground_truth or sample.answer
+            }
+    
+    dataset = Dataset.from_generator(
+        sample_rows,
+        features=Features({
+            'question': Value('string'),
+            'answer': Value('string'),
+            'contexts': Sequence(Value('string')),
+            'ground_truth': Value('string')
+        })
+    )
     
     # Run evaluation
     result = evaluate(
@@ -323,13 +428,10 @@ def run_ragas_evaluation(
         embeddings=embeddings
     )
     
-    # Extract metrics
-    metrics_dict = {
-        'faithfulness': float(result['faithfulness']),
-        'answer_relevancy': float(result['answer_relevancy']),
-        'context_precision': float(result['context_precision']),
-        'context_recall': float(result['context_recall'])
-    }
+    # Extract metrics: one columnar mean over the per-sample scores
+    metric_names = [m.name for m in metrics]
+    scores = result.to_pandas()[metric_names].to_numpy(dtype=np.float64)
+    metrics_dict = dict(zip(metric_names, np.nanmean(scores, axis=0).tolist()))
     
     # Create result object
     eval_result = EvalResult(
@@ -388,8 +490,9 @@ def print_evaluation_report(result: EvalResult):
 
 def save_evaluation_report(result: EvalResult, filepath: str):
     """Save evaluation results to JSON file."""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 bytes directly (no ASCII escaping)
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(result.to_dict(), option=orjson.OPT_INDENT_2))
     
     logger.info(f"Evaluation report saved to {filepath}")
 
@@ -452,6 +555,13 @@ def main():
         help="Path to file with questions to generate answers for"
     )
     
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=10,
+        help="Max concurrent agent calls with --questions-file (default: 10)"
+    )
+    
     args = parser.parse_args()
     
     # Create app context
@@ -466,12 +576,14 @@ def main():
             logger.info(f"Generating answers for questions in {args.questions_file}")
             with open(args.questions_file, 'r') as f:
                 questions = [line.strip() for line in f if line.strip()]
-            agent = KnowledgeBaseAgent()
+            from agent.graph import KnowledgeBaseAgent
+            agent = KnowledgeBaseAgent(use_checkpointing=False)
             samples = generate_evaluation_data(
                 user_id=args.user_id,
                 agent=agent,
                 questions=questions,
-                provider=args.provider
+                provider=args.provider,
+                concurrency=args.concurrency
             )
         else:
             logger.info(f"Collecting {args.samples} samples from database")
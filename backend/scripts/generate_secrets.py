@@ -3,28 +3,32 @@
 Secret Key Generator
 
 Generates secure random keys for Flask SECRET_KEY and JWT_SECRET_KEY.
-Uses Python's secrets module for cryptographically secure random generation.
+Uses os.urandom (the OS CSPRNG) for cryptographically secure random generation.
 
 Usage:
     python generate_secrets.py
 """
 
+import base64
+import os
 import secrets
 import string
 
+_b64encode = base64.urlsafe_b64encode
+
 
 def generate_secret_key(length: int = 64) -> str:
     """
     Generate a cryptographically secure secret key.
     
     Args:
-        length: Length of the key (default: 64 characters)
+        length: Number of random bytes (default: 64, ~86 characters)
     
     Returns:
         A secure random string
     """
-    # Use URL-safe base64 characters
-    return secrets.token_urlsafe(length)
+    # URL-safe base64 of a single urandom read, padding stripped
+    return _b64encode(os.urandom(length)).rstrip(b'=').decode('ascii')
 
 
 def generate_hex_key(length: int = 32) -> str:
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Convert Legacy Local-Time Timestamps to UTC
+
+Timestamp columns used to be written with datetime.now() (server local
+time) and are now written as naive UTC. This script rewrites every stored
+timestamp from local time to UTC, honoring DST per value.
+
+Run it ONCE per database, with the application stopped, when upgrading
+from a version that stored local times. Running it twice shifts the
+timestamps twice.
+
+Usage:
+    python -m scripts.migrate_timestamps_to_utc --dry-run
+    python -m scripts.migrate_timestamps_to_utc --timezone Asia/Shanghai
+"""
+
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from config import get_config
+from database.models import db, User, APIKey, FileDocument, ChatSession, ChatMessage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (model, timestamp columns) written in local time by earlier versions
+TIMESTAMP_COLUMNS = [
+    (User, ['created_at']),
+    (APIKey, ['created_at', 'updated_at']),
+    (FileDocument, ['upload_time', 'parsed_at']),
+    (ChatSession, ['created_at', 'last_active_at']),
+    (ChatMessage, ['created_at']),
+]
+
+BATCH_SIZE = 1000
+
+
+def to_utc(value: datetime, tz: Optional[ZoneInfo]) -> datetime:
+    """
+    Convert a naive local timestamp to naive UTC.
+    
+    Args:
+        value: Naive datetime in the legacy local time zone
+        tz: Legacy time zone, or None for this machine's local time zone
+    
+    Returns:
+        Naive UTC datetime
+    """
+    aware = value.replace(tzinfo=tz) if tz else value.astimezone()
+    return aware.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def migrate(tz: Optional[ZoneInfo], dry_run: bool) -> int:
+    """
+    Rewrite all timestamp columns from local time to UTC.
+    
+    Args:
+        tz: Legacy time zone, or None for this machine's local time zone
+        dry_run: Report what would change without committing
+    
+    Returns:
+        Number of rows updated
+    """
+    updated = 0
+    
+    for model, columns in TIMESTAMP_COLUMNS:
+        count = 0
+        for row in model.query.order_by(model.id).yield_per(BATCH_SIZE):
+            for column in columns:
+                value = getattr(row, column)
+                if value is not None:
+                    setattr(row, column, to_utc(value, tz))
+            count += 1
+        
+        logger.info(f"{model.__tablename__}: {count} rows")
+        updated += count
+    
+    if dry_run:
+        db.session.rollback()
+    else:
+        # Columns with onupdate (updated_at, last_active_at) are assigned
+        # explicitly above, so the flush keeps the converted values
+        db.session.commit()
+    
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert legacy local-time timestamps to UTC (run once)"
+    )
+    parser.add_argument(
+        "--timezone",
+        default=None,
+        help="IANA time zone the old server wrote in (default: this machine's)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Count affected rows without committing"
+    )
+    args = parser.parse_args()
+    
+    tz = ZoneInfo(args.timezone) if args.timezone else None
+    
+    app = Flask(__name__)
+    app.config.from_object(get_config())
+    db.init_app(app)
+    
+    with app.app_context():
+        updated = migrate(tz, args.dry_run)
+    
+    action = "Would update" if args.dry_run else "Updated"
+    logger.info(f"{action} {updated} rows")
+
+
+if __name__ == "__main__":
+    main()
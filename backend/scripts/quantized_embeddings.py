@@ -0,0 +1,36 @@
+"""
+Quantized Embeddings for RAGAS Evaluation
+
+Provides a LangChain-compatible embeddings class backed by the int8 ONNX
+embedder from services.onnx_embedder. Requires optimum[onnxruntime];
+imported lazily by the evaluation script.
+"""
+
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from services.onnx_embedder import OnnxEmbedder
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class QuantizedEmbeddings(Embeddings):
+    """
+    LangChain embeddings backed by a dynamically int8-quantized ONNX model.
+    
+    RAGAS only uses embeddings for similarity scoring, which tolerates int8
+    weights well. The model is exported and quantized once, then loaded
+    from the cache directory on later runs.
+    """
+    
+    BATCH_SIZE = 32
+    
+    def __init__(self, model_name: str = DEFAULT_MODEL, cache_dir: str = None):
+        self.embedder = OnnxEmbedder(model_name, cache_dir)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedder.encode(texts, self.BATCH_SIZE).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embedder.encode([text], self.BATCH_SIZE)[0].tolist()
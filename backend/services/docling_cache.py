@@ -0,0 +1,159 @@
+"""
+Docling Parse Cache
+
+This module provides a disk cache of parsed Docling documents. Entries are
+keyed by the SHA-256 of the file contents, the installed Docling version and
+the parsed page range, so reprocessing an unchanged file (to re-chunk or to
+switch embedding models) skips layout analysis and OCR entirely.
+
+Documents are stored as JSON files. The cache is bounded in size and
+evicts the least recently used entries (by file mtime).
+"""
+
+import os
+import hashlib
+import logging
+from functools import lru_cache
+from importlib.metadata import version
+from typing import Optional, Tuple
+
+from docling_core.types.doc import DoclingDocument
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=256)
+def _file_digest(filepath: str, mtime_ns: int, size: int) -> str:
+    """SHA-256 of a file's contents (memoized per path, mtime and size)."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DoclingCache:
+    """
+    Size-bounded disk cache of parsed Docling documents.
+    
+    Usage:
+        cache = DoclingCache()
+        doc = cache.get(filepath)
+        if doc is None:
+            doc = converter.convert(filepath).document
+            cache.put(filepath, doc)
+    """
+    
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        """
+        Create the cache directory if needed.
+        
+        Args:
+            cache_dir: Cache directory. Defaults to DOCLING_CACHE_DIR or
+                       './data/docling_cache'
+            max_bytes: Size bound. Defaults to DOCLING_CACHE_MAX_MB (2048) MB
+        """
+        self._cache_dir = cache_dir or os.getenv('DOCLING_CACHE_DIR', './data/docling_cache')
+        self._max_bytes = max_bytes or int(os.getenv('DOCLING_CACHE_MAX_MB', 2048)) * 1024 * 1024
+        self._docling_version = version('docling')
+        os.makedirs(self._cache_dir, exist_ok=True)
+    
+    def _entry_path(self, filepath: str, page_range: Optional[Tuple[int, int]]) -> str:
+        stat = os.stat(filepath)
+        digest = _file_digest(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+        pages = f"{page_range[0]}-{page_range[1]}" if page_range else "all"
+        return os.path.join(self._cache_dir, f"{digest}.{pages}.{self._docling_version}.json")
+    
+    def get(
+        self,
+        filepath: str,
+        page_range: Tuple[int, int] = None
+    ) -> Optional[DoclingDocument]:
+        """
+        Look up a parsed document.
+        
+        Args:
+            filepath: Path to the source file
+            page_range: Optional 1-based inclusive page range that was parsed
+        
+        Returns:
+            The cached DoclingDocument, or None on a miss
+        """
+        path = self._entry_path(filepath, page_range)
+        try:
+            with open(path, 'rb') as f:
+                document = DoclingDocument.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable Docling cache entry {path}: {str(e)}")
+            self._remove(path)
+            return None
+        
+        # Refresh mtime so eviction is least-recently-used
+        os.utime(path)
+        return document
+    
+    def put(
+        self,
+        filepath: str,
+        document: DoclingDocument,
+        page_range: Tuple[int, int] = None
+    ) -> None:
+        """
+        Store a parsed document, evicting old entries beyond the size bound.
+        
+        Args:
+            filepath: Path to the source file
+            document: Parsed Docling document
+            page_range: Optional 1-based inclusive page range that was parsed
+        """
+        path = self._entry_path(filepath, page_range)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(document.model_dump_json())
+        os.replace(tmp_path, path)
+        self._evict()
+    
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the size bound."""
+        entries = []
+        total = 0
+        with os.scandir(self._cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted concurrently by another worker
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        
+        if total <= self._max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            self._remove(path)
+            total -= size
+            if total <= self._max_bytes:
+                break
+    
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# Singleton instance
+_docling_cache = None
+
+
+def get_docling_cache() -> DoclingCache:
+    """Get or create the Docling parse cache singleton."""
+    global _docling_cache
+    if _docling_cache is None:
+        _docling_cache = DoclingCache()
+    return _docling_cache
@@ -0,0 +1,190 @@
+"""
+Embedding Cache
+
+This module provides a persistent, content-addressed cache for embedding
+vectors backed by SQLite. Keys are SHA-256 digests of (model name,
+embedding backend, text), so re-ingesting an unchanged document or encountering boilerplate chunks
+shared across documents skips the transformer forward pass entirely.
+
+Vectors are stored int8-quantized by default (a float32 scale followed by
+one signed byte per dimension), cutting the cache to roughly a quarter of
+its float32 size. EMBEDDING_CACHE_DTYPE=float16 or float32 trades space for
+exactness.
+"""
+
+import os
+import hashlib
+import sqlite3
+import threading
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache keyed by content hash.
+    
+    Usage:
+        cache = EmbeddingCache()
+        keys = cache.make_keys(model_name, backend, texts)
+        hits = cache.get_many(keys)
+        cache.put_many(model_name, miss_keys, miss_vectors)
+    """
+    
+    # Stay well below SQLite's bound-parameter limit for IN (...) lookups
+    LOOKUP_BATCH_SIZE = 500
+    
+    # Supported storage formats for cached vectors
+    DTYPES = ('int8', 'float16', 'float32')
+    
+    def __init__(self, path: str = None, dtype: str = None):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            path: SQLite file path. Defaults to EMBEDDING_CACHE_PATH or
+                  './data/embedding_cache.sqlite3'
+            dtype: Storage format for new entries ('int8', 'float16' or
+                   'float32'). Defaults to EMBEDDING_CACHE_DTYPE or 'int8'
+        """
+        self._path = path or os.getenv(
+            'EMBEDDING_CACHE_PATH',
+            './data/embedding_cache.sqlite3'
+        )
+        self._dtype = dtype or os.getenv('EMBEDDING_CACHE_DTYPE', 'int8')
+        if self._dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype: {self._dtype}")
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key BLOB PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                dtype TEXT NOT NULL DEFAULT 'float32'
+            )
+            """
+        )
+        # Caches created before quantization support lack the dtype column
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(embedding_cache)")]
+        if 'dtype' not in columns:
+            self._conn.execute(
+                "ALTER TABLE embedding_cache ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'"
+            )
+        self._conn.commit()
+    
+    @staticmethod
+    def make_keys(model_name: str, backend: str, texts: List[str]) -> List[bytes]:
+        """
+        Compute cache keys: sha256(model_name + NUL + backend + NUL + text).
+        
+        The backend (e.g. 'onnx-int8', 'torch-float16') is part of the key
+        because the same model yields slightly different vectors on each,
+        and one Chroma collection must not mix them.
+        """
+        prefix = model_name.encode('utf-8') + b'\0' + backend.encode('utf-8') + b'\0'
+        return [hashlib.sha256(prefix + text.encode('utf-8')).digest() for text in texts]
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up cached vectors.
+        
+        Args:
+            keys: Cache keys from make_keys
+        
+        Returns:
+            Mapping of key -> float32 vector for every cache hit
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self.LOOKUP_BATCH_SIZE):
+                batch = keys[start:start + self.LOOKUP_BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector, dtype FROM embedding_cache WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, blob, dtype in rows:
+                    found[key] = self._decode(blob, dtype)
+        return found
+    
+    def put_many(
+        self,
+        model_name: str,
+        keys: List[bytes],
+        vectors: np.ndarray
+    ) -> None:
+        """
+        Store vectors for the given keys.
+        
+        Args:
+            model_name: Embedding model name (stored for bookkeeping)
+            keys: Cache keys from make_keys
+            vectors: 2-D array with one row per key
+        """
+        rows = [
+            (key, model_name, blob, self._dtype)
+            for key, blob in zip(keys, self._encode(vectors))
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, model, vector, dtype) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+    
+    def _encode(self, vectors: np.ndarray) -> List[bytes]:
+        """Serialize each row of vectors in the configured storage format."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._dtype == 'float32':
+            return [vector.tobytes() for vector in vectors]
+        if self._dtype == 'float16':
+            return [vector.tobytes() for vector in vectors.astype(np.float16)]
+        
+        # Symmetric per-vector int8: scale maps the largest component to 127
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return [
+            scale.tobytes() + vector.tobytes()
+            for scale, vector in zip(scales.astype(np.float32), quantized)
+        ]
+    
+    @staticmethod
+    def _decode(blob: bytes, dtype: str) -> np.ndarray:
+        """Deserialize a stored vector back to float32."""
+        if dtype == 'int8':
+            scale = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+            return np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale
+        if dtype == 'float16':
+            return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return np.frombuffer(blob, dtype=np.float32)
+    
+    def clear(self, model_name: str = None) -> None:
+        """Remove cached vectors, optionally only for one model."""
+        with self._lock:
+            if model_name:
+                self._conn.execute("DELETE FROM embedding_cache WHERE model = ?", (model_name,))
+            else:
+                self._conn.execute("DELETE FROM embedding_cache")
+            self._conn.commit()
+
+
+# Singleton instance
+_embedding_cache = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the embedding cache singleton."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
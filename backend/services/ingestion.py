@@ -13,21 +13,89 @@ Supports:
 """
 
 import os
+import queue
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import repeat
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+import pypdfium2 as pdfium
+import torch
+from docling.datamodel.base_models import InputFormat
 from docling.document_converter import DocumentConverter
 from docling_core.transforms.chunker import HierarchicalChunker
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.util import batch_to_device
+
+from sqlalchemy import update
 
 from database.models import FileDocument, ParsingStatus, db
 from database.chroma_client import ChromaDBClient
+from services.embedding_cache import EmbeddingCache, get_embedding_cache
+from services.docling_cache import DoclingCache, get_docling_cache
+
+if TYPE_CHECKING:
+    from services.onnx_embedder import OnnxEmbedder
 
 logger = logging.getLogger(__name__)
 
 
+def load_embedding_model(model_name: str) -> SentenceTransformer:
+    """
+    Get the process-wide SentenceTransformer for model_name.
+    
+    The model is loaded once per process (on GPU in fp16 when CUDA is
+    available) and shared by every service that embeds with it.
+    """
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    return _load_embedding_model(model_name, device)
+
+
+@lru_cache(maxsize=4)
+def _load_embedding_model(model_name: str, device: str) -> SentenceTransformer:
+    logger.info(f"Loading embedding model: {model_name} on {device}")
+    model = SentenceTransformer(model_name, device=device)
+    if device == 'cuda':
+        model.half()
+    model.eval()
+    return model
+
+
+@lru_cache(maxsize=4)
+def load_onnx_embedder(model_name: str) -> Optional['OnnxEmbedder']:
+    """Load the int8 ONNX embedder once per process, or None if unavailable."""
+    try:
+        from services.onnx_embedder import OnnxEmbedder
+        return OnnxEmbedder(model_name)
+    except ImportError:
+        logger.warning("optimum[onnxruntime] not installed, using PyTorch embeddings on CPU")
+    except Exception as e:
+        logger.warning(f"ONNX export of {model_name} failed, using PyTorch embeddings on CPU: {str(e)}")
+    return None
+
+
+@dataclass
+class ChunkBatch:
+    """Chunks of one document as parallel lists (chunk_index is list position)."""
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)  # ChromaDB-ready, no None values
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+
+
+class _PartialChunkingError(Exception):
+    """Hierarchical chunking failed after some chunk batches were yielded."""
+
+
 class IngestionService:
     """
     Service for document ingestion, parsing, and vectorization.
@@ -42,6 +110,29 @@ class IngestionService:
     # Default embedding model (multilingual, good for academic papers)
     DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
     
+    # Sentences per forward pass; large enough to keep GPU tensor cores busy
+    EMBEDDING_BATCH_SIZE = 128
+    
+    # Chunks per ChromaDB add() call; bounds transaction size for large documents
+    CHROMA_BATCH_SIZE = 200
+    
+    # Chunks embedded per slice in process_document; each slice's ChromaDB
+    # write runs in the background while the next slice is encoded
+    EMBED_SLICE_SIZE = 1024
+    
+    # Chunks per micro-batch streamed from the chunker (one embedding batch)
+    CHUNK_STREAM_BATCH_SIZE = EMBEDDING_BATCH_SIZE
+    
+    # Batch pipeline: queue depth between parse, embed and store stages
+    PIPELINE_QUEUE_SIZE = 2
+    
+    # PDFs longer than this are parsed as parallel page ranges
+    PDF_SPLIT_THRESHOLD = 50  # pages
+    PDF_SPLIT_PAGES = 10  # pages per range
+    
+    # Chunk metadata fields kept for ChromaDB
+    CHUNK_METADATA_KEYS = ('page', 'section', 'heading')
+    
     # Chunking parameters
     DEFAULT_CHUNK_SIZE = 512  # tokens
     DEFAULT_CHUNK_OVERLAP = 50  # tokens
@@ -50,7 +141,9 @@ class IngestionService:
         self,
         embedding_model: str = None,
         chunk_size: int = None,
-        chunk_overlap: int = None
+        chunk_overlap: int = None,
+        use_embedding_cache: bool = True,
+        use_docling_cache: bool = True
     ):
         """
         Initialize the ingestion service.
@@ -59,23 +152,38 @@ class IngestionService:
             embedding_model: HuggingFace model name for embeddings
             chunk_size: Maximum chunk size in tokens
             chunk_overlap: Overlap between chunks in tokens
+            use_embedding_cache: Reuse embeddings of previously seen chunks
+            use_docling_cache: Reuse Docling parses of unchanged files
         """
         self.embedding_model_name = embedding_model or self.DEFAULT_EMBEDDING_MODEL
         self.chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
         self.chunk_overlap = chunk_overlap or self.DEFAULT_CHUNK_OVERLAP
+        self.use_embedding_cache = use_embedding_cache
+        self.use_docling_cache = use_docling_cache
+        
+        # On CPU-only hosts, embed with an int8 ONNX export of the model
+        self.use_onnx_on_cpu = os.getenv('EMBEDDING_ONNX_ON_CPU', '1') == '1'
+        
+        # Docling parse processes (one process-wide pool shared by all
+        # documents); each loads its own layout models, so keep this
+        # bounded on memory-constrained hosts
+        self.parse_workers = int(os.getenv('INGESTION_PARSE_WORKERS', 0)) or max(
+            1, (os.cpu_count() or 2) // 2
+        )
         
         # Lazy initialization for heavy resources
         self._embedding_model = None
         self._doc_converter = None
         self._chunker = None
         self._chroma_client = None
+        self._embedding_cache = None
+        self._docling_cache = None
     
     @property
     def embedding_model(self) -> SentenceTransformer:
-        """Lazy load embedding model."""
+        """Lazy load embedding model (shared per process, see load_embedding_model)."""
         if self._embedding_model is None:
-            logger.info(f"Loading embedding model: {self.embedding_model_name}")
-            self._embedding_model = SentenceTransformer(self.embedding_model_name)
+            self._embedding_model = load_embedding_model(self.embedding_model_name)
         return self._embedding_model
     
     @property
@@ -101,6 +209,60 @@ class IngestionService:
             self._chroma_client = ChromaDBClient()
         return self._chroma_client
     
+    @property
+    def embedding_cache(self) -> EmbeddingCache:
+        """Get the persistent embedding cache singleton."""
+        if self._embedding_cache is None:
+            self._embedding_cache = get_embedding_cache()
+        return self._embedding_cache
+    
+    @property
+    def docling_cache(self) -> DoclingCache:
+        """Get the Docling parse cache singleton."""
+        if self._docling_cache is None:
+            self._docling_cache = get_docling_cache()
+        return self._docling_cache
+    
+    @property
+    def onnx_embedder(self) -> Optional['OnnxEmbedder']:
+        """Int8 ONNX embedder for CPU-only hosts, or None to use PyTorch."""
+        if not self.use_onnx_on_cpu or torch.cuda.is_available():
+            return None
+        return load_onnx_embedder(self.embedding_model_name)
+    
+    @property
+    def embedding_backend(self) -> str:
+        """Backend that produces this service's vectors (part of the cache key)."""
+        if self.onnx_embedder is not None:
+            return 'onnx-int8'
+        # load_embedding_model runs the model in fp16 on GPU
+        return 'torch-float16' if torch.cuda.is_available() else 'torch-float32'
+    
+    def warmup(self, embeddings: bool = True) -> None:
+        """
+        Load models ahead of the first document.
+        
+        Runs one dummy encode (loading weights, creating the CUDA context
+        and selecting kernels) and initializes the Docling PDF pipeline
+        (layout and table models), so the first real document does not
+        stall on cold start.
+        
+        Args:
+            embeddings: Also warm the embedding model (parse-only workers
+                        never embed)
+        """
+        logger.info("Warming up ingestion service")
+        try:
+            if embeddings:
+                self._encode(["warmup"])
+                if torch.cuda.is_available():
+                    torch.cuda.synchronize()
+            _ = self.chunker
+            self.doc_converter.initialize_pipeline(InputFormat.PDF)
+        except Exception as e:
+            # Not fatal: anything not loaded here loads on first use
+            logger.warning(f"Ingestion warmup failed: {str(e)}")
+    
     def process_document(
         self,
         document_id: int,
@@ -136,51 +298,341 @@ class IngestionService:
             self._update_status(document, ParsingStatus.PROCESSING)
             
             # Step 1: Parse document with Docling
+            # (large PDFs are parsed and chunked as page ranges in parallel)
             logger.info(f"Parsing document: {document.filename}")
-            parsed_content = self._parse_document(document.filepath)
+            page_ranges = self._page_ranges(document.filepath)
+            if len(page_ranges) > 1:
+                chunks, error = self._parse_and_chunk_split(document.filepath, page_ranges)
+                chunk_batches = [chunks] if chunks else []
+                parsed_content = None
+            else:
+                parsed_content = self._parse_document(document.filepath)
+                error = None if parsed_content else "Failed to parse document"
+                # Step 2: Stream chunks straight into embedding
+                chunk_batches = self._iter_chunks(parsed_content) if parsed_content else []
             
-            if not parsed_content:
-                self._update_status(document, ParsingStatus.FAILED, "Failed to parse document")
-                return False, "Failed to parse document"
+            if error:
+                self._update_status(document, ParsingStatus.FAILED, error)
+                return False, error
             
-            # Step 2: Chunk the content
-            logger.info(f"Chunking document: {document.filename}")
-            chunks = self._chunk_document(parsed_content)
+            # Step 3-4: Generate embeddings and store in ChromaDB
+            logger.info(f"Embedding and storing chunks for: {document.filename}")
+            try:
+                chunk_ids = self._embed_and_store(
+                    user_id=user_id,
+                    doc_id=document_id,
+                    chunk_batches=chunk_batches,
+                    source=document.filename
+                )
+            except _PartialChunkingError as e:
+                logger.error(f"Chunking error: {str(e)}")
+                # Drop the streamed slices and store the fallback chunks instead
+                self.delete_document_vectors(user_id, document_id)
+                chunk_ids = self._embed_and_store(
+                    user_id=user_id,
+                    doc_id=document_id,
+                    chunk_batches=[self._fallback_chunking(parsed_content)],
+                    source=document.filename
+                )
             
-            if not chunks:
+            if not chunk_ids:
                 self._update_status(document, ParsingStatus.FAILED, "No content extracted")
                 return False, "No content extracted from document"
             
-            # Step 3: Generate embeddings
-            logger.info(f"Generating embeddings for {len(chunks)} chunks")
-            embeddings = self._generate_embeddings([c['text'] for c in chunks])
-            
-            # Step 4: Store in ChromaDB
-            logger.info(f"Storing {len(chunks)} chunks in ChromaDB")
-            chunk_ids = self._store_chunks(
-                user_id=user_id,
-                doc_id=document_id,
-                chunks=chunks,
-                embeddings=embeddings,
-                source=document.filename
-            )
-            
             # Update document status
             document.parsing_status = ParsingStatus.COMPLETED
-            document.chunk_count = len(chunks)
-            document.parsed_at = datetime.now()
+            document.chunk_count = len(chunk_ids)
+            document.parsed_at = datetime.utcnow()
             document.parsing_error = None
             db.session.commit()
             
             logger.info(f"Successfully processed document: {document.filename}")
-            return True, f"Successfully processed {len(chunks)} chunks"
+            return True, f"Successfully processed {len(chunk_ids)} chunks"
         
         except Exception as e:
             logger.error(f"Error processing document {document_id}: {str(e)}")
+            # Slices stored before the failure would stay searchable
+            self.delete_document_vectors(user_id, document_id)
             self._update_status(document, ParsingStatus.FAILED, str(e))
             return False, f"Processing error: {str(e)}"
     
-    def _parse_document(self, filepath: str) -> Optional[Any]:
+    def process_documents(
+        self,
+        document_ids: List[int],
+        user_id: int
+    ) -> Dict[int, Tuple[bool, str]]:
+        """
+        Process several documents with overlapping pipeline stages.
+        
+        Docling parsing and chunking run in a pool of worker processes (Docling
+        is CPU-bound Python, so threads would serialize on the GIL) while one
+        thread embeds the previously parsed document and another writes to
+        ChromaDB, so the CPU, GPU and vector store work concurrently. Bounded
+        queues between stages cap how many parsed documents are held in
+        memory. All database access stays on the calling thread.
+        
+        Args:
+            document_ids: FileDocument IDs
+            user_id: User ID for data isolation
+            
+        Returns:
+            Mapping of document ID -> (success, message)
+        """
+        results: Dict[int, Tuple[bool, str]] = {}
+        documents: Dict[int, FileDocument] = {}
+        
+        found = {
+            document.id: document
+            for document in FileDocument.query.filter(
+                FileDocument.id.in_(document_ids),
+                FileDocument.user_id == user_id
+            )
+        }
+        for document_id in document_ids:
+            document = found.get(document_id)
+            if not document:
+                results[document_id] = (False, "Document not found")
+            elif not os.path.exists(document.filepath):
+                document.parsing_status = ParsingStatus.FAILED
+                document.parsing_error = "File not found on disk"
+                results[document_id] = (False, "File not found on disk")
+            else:
+                documents[document_id] = document
+        
+        # One statement and one commit mark the whole batch as processing
+        if documents:
+            db.session.execute(
+                update(FileDocument)
+                .where(FileDocument.id.in_(list(documents)))
+                .values(parsing_status=ParsingStatus.PROCESSING, parsing_error=None)
+            )
+        db.session.commit()
+        
+        if not documents:
+            return results
+        
+        filenames = {doc_id: doc.filename for doc_id, doc in documents.items()}
+        embed_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+        write_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+        # document_id -> (True, chunk_count) or (False, error message)
+        outcomes: Dict[int, Tuple[bool, Any]] = {}
+        
+        def embed_stage() -> None:
+            while True:
+                item = embed_queue.get()
+                if item is None:
+                    write_queue.put(None)
+                    return
+                document_id, chunks = item
+                try:
+                    logger.info(f"Generating embeddings for {len(chunks)} chunks")
+                    embeddings = self._generate_embeddings(chunks.texts)
+                except Exception as e:
+                    logger.error(f"Error embedding document {document_id}: {str(e)}")
+                    outcomes[document_id] = (False, str(e))
+                    continue
+                write_queue.put((document_id, chunks, embeddings))
+        
+        def write_stage() -> None:
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    return
+                document_id, chunks, embeddings = item
+                try:
+                    logger.info(f"Storing {len(chunks)} chunks in ChromaDB")
+                    self._store_chunks(
+                        user_id=user_id,
+                        doc_id=document_id,
+                        chunks=chunks,
+                        embeddings=embeddings,
+                        source=filenames[document_id]
+                    )
+                    outcomes[document_id] = (True, len(chunks))
+                except Exception as e:
+                    logger.error(f"Error storing document {document_id}: {str(e)}")
+                    # Drop the ChromaDB batches written before the failure
+                    self.delete_document_vectors(user_id, document_id)
+                    outcomes[document_id] = (False, str(e))
+        
+        embedder = threading.Thread(target=embed_stage, name='ingestion-embed', daemon=True)
+        writer = threading.Thread(target=write_stage, name='ingestion-write', daemon=True)
+        embedder.start()
+        writer.start()
+        
+        pool = _get_parse_pool(self.parse_workers)
+        # future -> (document_id, parts list, index of its page range)
+        pending = {}
+        try:
+            # document_id -> per-range chunk batches, None until parsed
+            parts: Dict[int, List[Optional[ChunkBatch]]] = {}
+            
+            def submit(document_id: int, page_ranges: List[Optional[Tuple[int, int]]]) -> None:
+                parts[document_id] = [None] * len(page_ranges)
+                for index, page_range in enumerate(page_ranges):
+                    future = pool.submit(
+                        _parse_and_chunk_worker,
+                        documents[document_id].filepath,
+                        self.chunk_size,
+                        self.chunk_overlap,
+                        page_range
+                    )
+                    pending[future] = (document_id, parts[document_id], index)
+            
+            for document_id, document in documents.items():
+                submit(document_id, self._page_ranges(document.filepath))
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    document_id, doc_parts, index = pending.pop(future)
+                    if doc_parts is not parts[document_id] or document_id in outcomes:
+                        continue  # superseded by a full-file retry, or already failed
+                    try:
+                        chunks, error = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        chunks, error = None, str(e)
+                    if error:
+                        if len(doc_parts) > 1:
+                            logger.warning(
+                                f"Page range parsing failed for document {document_id}, "
+                                f"retrying as a single file: {error}"
+                            )
+                            submit(document_id, [None])
+                            continue
+                        logger.error(f"Error parsing document {document_id}: {error}")
+                        outcomes[document_id] = (False, error)
+                        continue
+                    doc_parts[index] = chunks
+                    if any(part is None for part in doc_parts):
+                        continue
+                    chunks = self._merge_chunk_parts(doc_parts)
+                    if not chunks:
+                        outcomes[document_id] = (False, "No content extracted")
+                        continue
+                    # Blocks while the embedder is behind, bounding memory use
+                    embed_queue.put((document_id, chunks))
+        except BrokenProcessPool:
+            _discard_parse_pool(pool)
+            raise
+        finally:
+            # The pool is shared: drop this batch's queued work on failure
+            for future in pending:
+                future.cancel()
+            embed_queue.put(None)
+            embedder.join()
+            writer.join()
+            
+            # Runs on errors too, so no document is left PROCESSING
+            for document_id, document in documents.items():
+                if document_id not in outcomes:
+                    self.delete_document_vectors(user_id, document_id)
+                success, detail = outcomes.get(document_id, (False, "Processing aborted"))
+                if success:
+                    document.parsing_status = ParsingStatus.COMPLETED
+                    document.chunk_count = detail
+                    document.parsed_at = datetime.utcnow()
+                    document.parsing_error = None
+                    results[document_id] = (True, f"Successfully processed {detail} chunks")
+                else:
+                    document.parsing_status = ParsingStatus.FAILED
+                    document.parsing_error = detail
+                    results[document_id] = (False, f"Processing error: {detail}")
+            db.session.commit()
+        
+        logger.info(f"Processed {len(documents)} documents through ingestion pipeline")
+        return results
+    
+    def _parse_and_chunk(
+        self,
+        filepath: str,
+        page_range: Tuple[int, int] = None
+    ) -> Tuple[Optional[ChunkBatch], Optional[str]]:
+        """
+        Parse and chunk a document, or one page range of it.
+        
+        Returns:
+            Tuple of (chunks, None) on success or (None, error message)
+            if parsing failed. The chunk batch may be empty.
+        """
+        parsed_content = self._parse_document(filepath, page_range)
+        if not parsed_content:
+            return None, "Failed to parse document"
+        return self._chunk_document(parsed_content), None
+    
+    def _parse_and_chunk_split(
+        self,
+        filepath: str,
+        page_ranges: List[Optional[Tuple[int, int]]] = None
+    ) -> Tuple[Optional[ChunkBatch], Optional[str]]:
+        """
+        Parse and chunk a document, splitting large PDFs across processes.
+        
+        Each page range is converted by a worker of the shared parse pool and
+        the chunk batches are concatenated in page order. If any range fails,
+        the whole file is parsed again in a single pass.
+        """
+        page_ranges = page_ranges or self._page_ranges(filepath)
+        if len(page_ranges) > 1:
+            pool = _get_parse_pool(self.parse_workers)
+            try:
+                parts = list(pool.map(
+                    _parse_and_chunk_worker,
+                    repeat(filepath),
+                    repeat(self.chunk_size),
+                    repeat(self.chunk_overlap),
+                    page_ranges
+                ))
+                errors = [error for _, error in parts if error]
+                if not errors:
+                    return self._merge_chunk_parts([chunks for chunks, _ in parts]), None
+                logger.warning(f"Page range parsing failed, retrying as a single file: {errors[0]}")
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    _discard_parse_pool(pool)
+                logger.warning(f"Page range parsing failed, retrying as a single file: {str(e)}")
+        
+        return self._parse_and_chunk(filepath)
+    
+    def _page_ranges(self, filepath: str) -> List[Optional[Tuple[int, int]]]:
+        """
+        Plan page ranges for parsing.
+        
+        Returns:
+            1-based inclusive (start, end) ranges of PDF_SPLIT_PAGES pages for
+            PDFs longer than PDF_SPLIT_THRESHOLD, otherwise [None] (whole file)
+        """
+        if not filepath.lower().endswith('.pdf'):
+            return [None]
+        try:
+            pdf = pdfium.PdfDocument(filepath)
+            try:
+                page_count = len(pdf)
+            finally:
+                pdf.close()
+        except Exception as e:
+            logger.warning(f"Could not count PDF pages, parsing as one file: {str(e)}")
+            return [None]
+        
+        if page_count <= self.PDF_SPLIT_THRESHOLD:
+            return [None]
+        return [
+            (start, min(start + self.PDF_SPLIT_PAGES - 1, page_count))
+            for start in range(1, page_count + 1, self.PDF_SPLIT_PAGES)
+        ]
+    
+    @staticmethod
+    def _merge_chunk_parts(parts: List[ChunkBatch]) -> ChunkBatch:
+        """Concatenate per-range chunk batches in order."""
+        merged = ChunkBatch()
+        for part in parts:
+            merged.texts.extend(part.texts)
+            merged.metadatas.extend(part.metadatas)
+        return merged
+    
+    def _parse_document(self, filepath: str, page_range: Tuple[int, int] = None) -> Optional[Any]:
         """
         Parse document using Docling.
         
@@ -190,20 +642,41 @@ class IngestionService:
         - Figure/image handling
         - Layout analysis
         
+        Parses of unchanged files are served from the Docling cache.
+        
         Args:
             filepath: Path to the document file
+            page_range: Optional 1-based inclusive (start, end) pages to convert
             
         Returns:
             Docling document object or None if parsing fails
         """
+        if self.use_docling_cache:
+            try:
+                cached = self.docling_cache.get(filepath, page_range)
+                if cached is not None:
+                    logger.info(f"Docling cache hit: {filepath} (pages {page_range or 'all'})")
+                    return cached
+            except Exception as e:
+                logger.warning(f"Docling cache lookup failed: {str(e)}")
+        
         try:
-            result = self.doc_converter.convert(filepath)
-            return result.document
+            if page_range:
+                result = self.doc_converter.convert(filepath, page_range=page_range)
+            else:
+                result = self.doc_converter.convert(filepath)
         except Exception as e:
             logger.error(f"Docling parsing error: {str(e)}")
             return None
+        
+        if self.use_docling_cache:
+            try:
+                self.docling_cache.put(filepath, result.document, page_range)
+            except Exception as e:
+                logger.warning(f"Docling cache write failed: {str(e)}")
+        return result.document
     
-    def _chunk_document(self, docling_doc) -> List[Dict[str, Any]]:
+    def _chunk_document(self, docling_doc) -> ChunkBatch:
         """
         Apply hierarchical chunking to parsed document.
         
@@ -214,41 +687,68 @@ class IngestionService:
             docling_doc: Parsed Docling document
             
         Returns:
-            List of chunk dictionaries with text and metadata
+            ChunkBatch of chunk texts and their metadata
         """
-        chunks = []
+        try:
+            return self._merge_chunk_parts(list(self._iter_chunks(docling_doc)))
+        except _PartialChunkingError as e:
+            logger.error(f"Chunking error: {str(e)}")
+            return self._fallback_chunking(docling_doc)
+    
+    def _iter_chunks(self, docling_doc) -> Iterator[ChunkBatch]:
+        """
+        Stream hierarchical chunks in micro-batches.
+        
+        Docling chunk objects are consumed one at a time from the chunker's
+        generator and reduced to text and metadata, so embedding can start
+        before chunking finishes and the raw chunks are never held at once.
+        
+        Args:
+            docling_doc: Parsed Docling document
+            
+        Yields:
+            ChunkBatch of up to CHUNK_STREAM_BATCH_SIZE chunks
+        
+        Raises:
+            _PartialChunkingError: If chunking fails after batches were yielded
+        """
+        chunks = ChunkBatch()
+        produced = False
         
         try:
             # Use Docling's hierarchical chunker
-            raw_chunks = list(self.chunker.chunk(docling_doc))
-            
-            for i, chunk in enumerate(raw_chunks):
-                chunk_data = {
-                    'text': chunk.text,
-                    'chunk_index': i,
-                    'metadata': {}
-                }
+            for chunk in self.chunker.chunk(docling_doc):
+                # Filter out empty chunks
+                if not chunk.text.strip():
+                    continue
                 
-                # Extract metadata if available
-                if hasattr(chunk, 'meta'):
-                    chunk_data['metadata'] = {
-                        'page': getattr(chunk.meta, 'page', None),
-                        'section': getattr(chunk.meta, 'section', None),
-                        'heading': getattr(chunk.meta, 'heading', None),
-                    }
+                # Extract metadata if available, dropping None values
+                meta = getattr(chunk, 'meta', None)
+                chunks.texts.append(chunk.text)
+                chunks.metadatas.append({
+                    key: value
+                    for key in self.CHUNK_METADATA_KEYS
+                    if (value := getattr(meta, key, None)) is not None
+                })
                 
-                # Filter out empty chunks
-                if chunk_data['text'].strip():
-                    chunks.append(chunk_data)
-            
-            return chunks
+                if len(chunks) >= self.CHUNK_STREAM_BATCH_SIZE:
+                    produced = True
+                    yield chunks
+                    chunks = ChunkBatch()
         
         except Exception as e:
+            if produced:
+                # Earlier batches were already consumed; the caller discards
+                # them and falls back, otherwise the fallback would duplicate them
+                raise _PartialChunkingError(str(e)) from e
             logger.error(f"Chunking error: {str(e)}")
             # Fallback: try to get markdown and do simple splitting
-            return self._fallback_chunking(docling_doc)
+            chunks = self._fallback_chunking(docling_doc)
+        
+        if chunks:
+            yield chunks
     
-    def _fallback_chunking(self, docling_doc) -> List[Dict[str, Any]]:
+    def _fallback_chunking(self, docling_doc) -> ChunkBatch:
         """
         Fallback chunking using simple text splitting.
         
@@ -259,7 +759,7 @@ class IngestionService:
             markdown_text = docling_doc.export_to_markdown()
             
             if not markdown_text:
-                return []
+                return ChunkBatch()
             
             # Simple recursive splitting
             chunks = self._recursive_split(
@@ -268,15 +768,12 @@ class IngestionService:
                 overlap=self.chunk_overlap * 4
             )
             
-            return [
-                {'text': chunk, 'chunk_index': i, 'metadata': {}}
-                for i, chunk in enumerate(chunks)
-                if chunk.strip()
-            ]
+            texts = [chunk for chunk in chunks if chunk.strip()]
+            return ChunkBatch(texts=texts, metadatas=[{} for _ in texts])
         
         except Exception as e:
             logger.error(f"Fallback chunking error: {str(e)}")
-            return []
+            return ChunkBatch()
     
     def _recursive_split(
         self,
@@ -285,79 +782,223 @@ class IngestionService:
         overlap: int = 200
     ) -> List[str]:
         """
-        Recursively split text into chunks.
+        Split text into overlapping chunks in a single forward pass.
         
-        Tries to split on natural boundaries:
+        Each chunk ends on the most natural boundary found in the back half
+        of its window, trying in order:
         1. Double newlines (paragraphs)
         2. Single newlines
         3. Sentences (periods)
         4. Words
+        and falls back to a hard cut at max_length. The next chunk starts
+        `overlap` characters before the previous one ended, so every
+        character is copied a bounded number of times.
         """
         if len(text) <= max_length:
             return [text]
         
-        # Try splitting on different separators
-        separators = ['\n\n', '\n', '. ', ' ']
+        separators = ('\n\n', '\n', '. ', ' ')
+        chunks = []
+        # Bind hot lookups locally; the scanning itself runs in C (str.rfind)
+        append = chunks.append
+        rfind = text.rfind
+        half = max_length // 2
+        n = len(text)
+        i = 0
         
-        for sep in separators:
-            if sep in text:
-                parts = text.split(sep)
-                chunks = []
-                current_chunk = ""
-                
-                for part in parts:
-                    test_chunk = current_chunk + sep + part if current_chunk else part
-                    
-                    if len(test_chunk) <= max_length:
-                        current_chunk = test_chunk
-                    else:
-                        if current_chunk:
-                            chunks.append(current_chunk)
-                        current_chunk = part
-                
-                if current_chunk:
-                    chunks.append(current_chunk)
-                
-                # Apply overlap
-                if overlap > 0 and len(chunks) > 1:
-                    overlapped_chunks = []
-                    for i, chunk in enumerate(chunks):
-                        if i > 0:
-                            # Add overlap from previous chunk
-                            prev_overlap = chunks[i-1][-overlap:]
-                            chunk = prev_overlap + chunk
-                        overlapped_chunks.append(chunk)
-                    return overlapped_chunks
-                
-                return chunks
+        while i < n:
+            end = i + max_length
+            if end >= n:
+                append(text[i:])
+                break
+            floor = i + half
+            for sep in separators:
+                j = rfind(sep, floor, end)
+                if j != -1:
+                    end = j + len(sep)
+                    break
+            append(text[i:end])
+            # Step back for overlap, but always make progress
+            next_i = end - overlap
+            i = next_i if next_i > i else end
         
-        # Fallback: hard split
-        return [text[i:i+max_length] for i in range(0, len(text), max_length - overlap)]
+        return chunks
     
-    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for text chunks.
         
+        Identical texts within the batch (repeated headers, footers and
+        boilerplate) are embedded once, and chunks already in the persistent
+        embedding cache (same model, backend and identical text) are not
+        re-encoded; only unique cache misses go through the model.
+        
         Args:
             texts: List of text strings
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dim)
         """
-        embeddings = self.embedding_model.encode(
-            texts,
-            show_progress_bar=True,
-            convert_to_numpy=True
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        # Map each text to the index of its first occurrence
+        unique: Dict[str, int] = {}
+        inverse = np.fromiter(
+            (unique.setdefault(text, len(unique)) for text in texts),
+            dtype=np.intp,
+            count=len(texts)
         )
-        return embeddings.tolist()
+        if len(unique) == len(texts):
+            return self._embed_unique(texts)
+        
+        logger.info(f"Embedding {len(unique)} unique texts for {len(texts)} chunks")
+        return self._embed_unique(list(unique))[inverse]
     
-    def _store_chunks(
+    def _embed_unique(self, texts: List[str]) -> np.ndarray:
+        """Embed distinct texts, serving hits from the persistent cache."""
+        if not self.use_embedding_cache:
+            return self._encode(texts)
+        
+        keys = self.embedding_cache.make_keys(
+            self.embedding_model_name,
+            self.embedding_backend,
+            texts
+        )
+        cached = self.embedding_cache.get_many(keys)
+        miss_idx = [i for i, key in enumerate(keys) if key not in cached]
+        
+        encoded = None
+        if miss_idx:
+            encoded = self._encode([texts[i] for i in miss_idx])
+            self.embedding_cache.put_many(
+                self.embedding_model_name,
+                [keys[i] for i in miss_idx],
+                encoded
+            )
+        
+        logger.info(f"Embedding cache: {len(texts) - len(miss_idx)} hits, {len(miss_idx)} misses")
+        
+        # Scatter cache hits and fresh encodings into one output array
+        dim = encoded.shape[1] if encoded is not None else next(iter(cached.values())).shape[0]
+        embeddings = np.empty((len(texts), dim), dtype=np.float32)
+        if encoded is not None:
+            embeddings[miss_idx] = encoded
+        for i, key in enumerate(keys):
+            if key in cached:
+                embeddings[i] = cached[key]
+        
+        return embeddings
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Run the embedding model over texts and return float32 vectors.
+        
+        Texts are encoded in length order so each batch pads to a similar
+        sequence length, then scattered back to input order. CPU-only hosts
+        use the int8 ONNX embedder when available, everything else the
+        PyTorch model.
+        """
+        order = np.argsort([len(t) for t in texts], kind='stable')
+        sorted_texts = [texts[i] for i in order]
+        
+        onnx_embedder = self.onnx_embedder
+        if onnx_embedder is not None:
+            sorted_embeddings = onnx_embedder.encode(sorted_texts, self.EMBEDDING_BATCH_SIZE)
+        else:
+            sorted_embeddings = self._encode_torch(sorted_texts)
+        
+        embeddings = np.empty(sorted_embeddings.shape, dtype=np.float32)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+    
+    def _encode_torch(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts (already in batch order) with the PyTorch model.
+        
+        Batches are driven here rather than by encode() so the next batch is
+        tokenized (HF fast tokenizers release the GIL) on a helper thread
+        while the current one runs through the model.
+        """
+        batch_size = self.EMBEDDING_BATCH_SIZE
+        batches = [
+            texts[start:start + batch_size]
+            for start in range(0, len(texts), batch_size)
+        ]
+        
+        model = self.embedding_model
+        # preprocess() replaced tokenize() in newer sentence-transformers
+        tokenize = getattr(model, 'preprocess', None) or model.tokenize
+        
+        outputs = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingestion-tokenize') as tokenizer:
+            pending = tokenizer.submit(tokenize, batches[0])
+            with torch.inference_mode():
+                for k in range(len(batches)):
+                    features = pending.result()
+                    if k + 1 < len(batches):
+                        pending = tokenizer.submit(tokenize, batches[k + 1])
+                    features = batch_to_device(features, model.device)
+                    # fp16 models produce float16; store and query in float32
+                    outputs.append(model(features)['sentence_embedding'].float().cpu().numpy())
+        
+        return np.concatenate(outputs)
+    
+    def _embed_and_store(
         self,
         user_id: int,
         doc_id: int,
-        chunks: List[Dict[str, Any]],
-        embeddings: List[List[float]],
+        chunk_batches: Iterable[ChunkBatch],
         source: str
+    ) -> List[str]:
+        """
+        Embed chunks slice by slice, overlapping storage with encoding.
+        
+        Chunk batches may be streamed (e.g. from _iter_chunks); batches
+        larger than EMBED_SLICE_SIZE are sliced. A single writer thread
+        stores slice k in ChromaDB while slice k+1 is encoded; at most one
+        write is in flight, so memory stays bounded and writes land in order.
+        
+        Returns:
+            List of chunk IDs
+        """
+        chunk_ids = []
+        slice_size = self.EMBED_SLICE_SIZE
+        offset = 0
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingestion-write') as writer:
+            pending = None
+            for batch in chunk_batches:
+                for start in range(0, len(batch), slice_size):
+                    end = start + slice_size
+                    part = ChunkBatch(
+                        texts=batch.texts[start:end],
+                        metadatas=batch.metadatas[start:end]
+                    )
+                    embeddings = self._generate_embeddings(part.texts)
+                    if pending is not None:
+                        chunk_ids.extend(pending.result())
+                    pending = writer.submit(
+                        self._store_chunks,
+                        user_id=user_id,
+                        doc_id=doc_id,
+                        chunks=part,
+                        embeddings=embeddings,
+                        source=source,
+                        start_index=offset
+                    )
+                    offset += len(part)
+            if pending is not None:
+                chunk_ids.extend(pending.result())
+        return chunk_ids
+    
+    def _store_chunks(
+        self,
+        user_id: int,
+        doc_id: int,
+        chunks: ChunkBatch,
+        embeddings: np.ndarray,
+        source: str,
+        start_index: int = 0
     ) -> List[str]:
         """
         Store chunks and embeddings in ChromaDB.
@@ -365,33 +1006,28 @@ class IngestionService:
         Args:
             user_id: User ID for isolation
             doc_id: Document ID
-            chunks: List of chunk dictionaries
-            embeddings: List of embedding vectors
+            chunks: Chunk texts and metadata
+            embeddings: float32 array with one row per chunk
             source: Source filename
+            start_index: Position of the first chunk within the document
             
         Returns:
             List of chunk IDs
         """
-        # Prepare metadata for each chunk
-        metadatas = []
-        for chunk in chunks:
-            meta = {
-                'page': chunk['metadata'].get('page'),
-                'section': chunk['metadata'].get('section'),
-                'heading': chunk['metadata'].get('heading'),
-            }
-            # Remove None values
-            metadatas.append({k: v for k, v in meta.items() if v is not None})
-        
-        # Store in ChromaDB
-        chunk_ids = self.chroma_client.add_document_chunks(
-            user_id=user_id,
-            doc_id=doc_id,
-            chunks=[c['text'] for c in chunks],
-            embeddings=embeddings,
-            metadatas=metadatas,
-            source=source
-        )
+        # Store in ChromaDB in bounded batches (embedding slices are views)
+        chunk_ids = []
+        batch_size = self.CHROMA_BATCH_SIZE
+        for start in range(0, len(chunks), batch_size):
+            end = start + batch_size
+            chunk_ids.extend(self.chroma_client.add_document_chunks(
+                user_id=user_id,
+                doc_id=doc_id,
+                chunks=chunks.texts[start:end],
+                embeddings=embeddings[start:end],
+                metadatas=chunks.metadatas[start:end],
+                source=source,
+                start_index=start_index + start
+            ))
         
         return chunk_ids
     
@@ -401,7 +1037,13 @@ class IngestionService:
         status: ParsingStatus,
         error: str = None
     ):
-        """Update document parsing status."""
+        """
+        Update document parsing status.
+        
+        Every state is committed, so PROCESSING is visible to status polling
+        and claims the document. Batch ingestion (process_documents) writes
+        its statuses in bulk instead of calling this per document.
+        """
         document.parsing_status = status
         document.parsing_error = error
         if status == ParsingStatus.COMPLETED:
@@ -443,7 +1085,7 @@ class IngestionService:
         # Reprocess
         return self.process_document(document_id, user_id)
     
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
         
@@ -453,19 +1095,95 @@ class IngestionService:
             text: Input text
             
         Returns:
-            Embedding vector
+            float32 embedding vector
         """
-        embedding = self.embedding_model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return self._encode([text])[0]
+
+
+# Process-wide Docling parse pool, shared by every document and request
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Get or create the shared parse pool (thread-safe).
+    
+    Workers import torch and load the Docling models once and then serve
+    every document, so concurrent uploads queue on at most max_workers
+    parse processes instead of each spawning (and tearing down) their own.
+    The first caller's max_workers sizes the pool.
+    """
+    global _parse_pool
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            # Double-checked locking pattern
+            if _parse_pool is None:
+                # spawn, not fork: the parent may hold CUDA state and live threads
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_parse_worker
+                )
+    return _parse_pool
+
+
+def _discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool (a worker died) so the next caller starts a fresh one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Per-process service used by batch parse workers
+_worker_service = None
+
+
+def _init_parse_worker() -> None:
+    """Process pool initializer: build the worker's service up front."""
+    global _worker_service
+    _worker_service = IngestionService(use_embedding_cache=False)
+    if os.getenv('WARMUP_ON_START') == '1':
+        _worker_service.warmup(embeddings=False)
+
+
+def _parse_and_chunk_worker(
+    filepath: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    page_range: Tuple[int, int] = None
+) -> Tuple[Optional[ChunkBatch], Optional[str]]:
+    """
+    Parse and chunk a document (or one page range) inside a parse worker process.
+    
+    Only the filepath and a plain ChunkBatch cross the process boundary;
+    each worker builds its own Docling converter once and reuses it.
+    """
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = IngestionService(use_embedding_cache=False)
+    _worker_service.chunk_size = chunk_size
+    _worker_service.chunk_overlap = chunk_overlap
+    return _worker_service._parse_and_chunk(filepath, page_range)
 
 
 # Singleton instance
 _ingestion_service = None
+_ingestion_service_lock = threading.Lock()
 
 
 def get_ingestion_service() -> IngestionService:
-    """Get or create the ingestion service singleton."""
+    """Get or create the ingestion service singleton (thread-safe)."""
     global _ingestion_service
     if _ingestion_service is None:
-        _ingestion_service = IngestionService()
+        with _ingestion_service_lock:
+            # Double-checked locking pattern
+            if _ingestion_service is None:
+                service = IngestionService()
+                if os.getenv('WARMUP_ON_START') == '1':
+                    service.warmup()
+                # Publish only once warm so no thread sees a cold service
+                _ingestion_service = service
     return _ingestion_service
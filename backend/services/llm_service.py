@@ -8,21 +8,157 @@ This module provides a unified interface for different LLM providers:
 Features:
 - Provider abstraction
 - Streaming support
+- Pooled sync and async HTTP clients
 - Token counting
 - Error handling
 """
 
 import os
+import time
+import random
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Generator, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Generator, AsyncGenerator, Tuple, Union
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from enum import Enum
 
-import requests
+import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Connection pool bounds for the shared HTTP clients
+HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+
+# Retry policy for provider calls: status codes and transport errors worth
+# retrying (rate limited / transient), and the base delay before each retry.
+# Read timeouts are not retried: a 60s completion that timed out would
+# likely time out again.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_TRANSPORT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError
+)
+RETRY_DELAYS = (0.5, 1.0, 2.0)
+MAX_RETRY_AFTER = 30.0
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, RETRYABLE_TRANSPORT_ERRORS)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying, honoring a Retry-After header."""
+    if isinstance(error, httpx.HTTPStatusError):
+        retry_after = error.response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_AFTER)
+    # Jitter so concurrent callers do not retry in lockstep
+    return RETRY_DELAYS[min(attempt, len(RETRY_DELAYS) - 1)] * random.uniform(0.8, 1.2)
+
+
+def _split_lines(pending: bytes, chunk: bytes) -> Tuple[List[bytes], bytes]:
+    """Split buffered stream bytes into complete lines and the unfinished tail."""
+    lines = (pending + chunk).split(b'\n')
+    return lines, lines.pop()
+
+
+class _DeltaBuffer:
+    """
+    Coalesces streamed content deltas into larger chunks.
+    
+    Providers emit a delta of a few characters per token; yielding each one
+    costs the consumer a write per token. Deltas are flushed once
+    FLUSH_CHARS have accumulated or FLUSH_INTERVAL seconds have passed since
+    the last flush (so the first delta goes out immediately).
+    """
+    
+    FLUSH_CHARS = 64
+    FLUSH_INTERVAL = 0.02
+    
+    def __init__(self):
+        self._parts: List[str] = []
+        self._size = 0
+        self._last_flush = 0.0
+    
+    def add(self, content: Optional[str]) -> Optional[str]:
+        """Buffer a delta; return the coalesced text when it is time to flush."""
+        if not content:
+            return None
+        self._parts.append(content)
+        self._size += len(content)
+        now = time.monotonic()
+        if self._size >= self.FLUSH_CHARS or now - self._last_flush >= self.FLUSH_INTERVAL:
+            self._last_flush = now
+            return self.flush()
+        return None
+    
+    def flush(self) -> Optional[str]:
+        """Return and clear whatever is buffered."""
+        if not self._parts:
+            return None
+        text = ''.join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return text
+
+
+class _RateLimiter:
+    """Spaces calls evenly to stay under a requests-per-minute quota."""
+    
+    def __init__(self, per_minute: int):
+        self._interval = 60.0 / per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Claim the next slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+            return slot - now
+
+
+class _AsyncClientPool:
+    """
+    One pooled httpx.AsyncClient per running event loop.
+    
+    AsyncClient connections are bound to the loop that opened them, so a
+    single process-wide client fails on the second asyncio.run(). Clients
+    are created on first use in each loop; entries for closed loops are
+    dropped so their connections can be garbage collected.
+    """
+    
+    def __init__(self):
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+    
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=HTTP_LIMITS)
+    
+    def get(self) -> httpx.AsyncClient:
+        """Return the client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(loop)
+                if client is None:
+                    for closed in [l for l in self._clients if l.is_closed()]:
+                        del self._clients[closed]
+                    client = self._new_client()
+                    self._clients[loop] = client
+        return client
+
 
 class LLMProvider(Enum):
     """Supported LLM providers."""
@@ -42,33 +178,264 @@ class LLMResponse:
 
 @dataclass 
 class Message:
-    """Chat message."""
+    """
+    Chat message.
+    
+    Requests carry plain {'role', 'content'} dicts internally; Message is
+    accepted at the client boundary for typed callers.
+    """
     role: str  # 'user', 'assistant', 'system'
     content: str
+    
+    def to_dict(self) -> Dict[str, str]:
+        return {'role': self.role, 'content': self.content}
+
+
+def _as_dicts(messages: List[Union[Dict[str, str], Message]]) -> List[Dict[str, str]]:
+    """Convert any Message objects to payload dicts; dict lists pass through."""
+    if any(isinstance(m, Message) for m in messages):
+        return [m.to_dict() if isinstance(m, Message) else m for m in messages]
+    return messages
 
 
 class BaseLLMClient(ABC):
-    """Abstract base class for LLM clients."""
+    """
+    Abstract base class for LLM clients.
+    
+    Handles HTTP transport: subclasses describe the provider's request and
+    response format. Requests go through pooled httpx clients (shared across
+    clients by LLMService) so keep-alive connections are reused instead of
+    paying a TCP+TLS handshake per call.
+    """
+    
+    BASE_URL = ""
+    NAME = ""
+    
+    MAX_RETRIES = len(RETRY_DELAYS)
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        http_client: httpx.Client = None,
+        async_http_clients: _AsyncClientPool = None
+    ):
+        self.api_key = api_key
+        self.model = model
+        self._http = http_client or httpx.Client(limits=HTTP_LIMITS)
+        self._async_http = async_http_clients or _AsyncClientPool()
     
     @abstractmethod
-    def chat(
+    def _build_request(
         self,
-        messages: List[Message],
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
-        stream: bool = False
-    ) -> Union[LLMResponse, Generator[str, None, None]]:
-        """Send chat completion request."""
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool
+    ) -> Tuple[Dict, Dict]:
+        """Build (headers, payload) for a chat completion request."""
+        pass
+    
+    @abstractmethod
+    def _parse_response(self, data: Dict, model: str) -> LLMResponse:
+        """Parse a non-streaming response body."""
+        pass
+    
+    @abstractmethod
+    def _parse_stream_line(self, line: bytes) -> Optional[str]:
+        """Extract the content delta from one raw SSE line, if any."""
         pass
     
     @abstractmethod
     def chat_with_deep_thought(
         self,
-        messages: List[Message],
+        messages: List[Dict[str, str]],
         max_tokens: int = 4096
     ) -> LLMResponse:
         """Send chat with extended reasoning (deep thought mode)."""
         pass
+    
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        stream: bool = False,
+        model: Optional[str] = None
+    ) -> Union[LLMResponse, Generator[str, None, None]]:
+        """Send chat completion request."""
+        model = model or self.model
+        headers, payload = self._build_request(_as_dicts(messages), model, temperature, max_tokens, stream)
+        
+        if stream:
+            return self._stream_response(headers, payload)
+        
+        try:
+            response = self._send(headers, payload)
+            return self._parse_response(response.json(), model)
+        
+        except Exception as e:
+            logger.error(f"{self.NAME} API error: {str(e)}")
+            raise
+    
+    async def chat_async(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        stream: bool = False,
+        model: Optional[str] = None
+    ) -> Union[LLMResponse, AsyncGenerator[str, None]]:
+        """Send chat completion request without blocking the event loop."""
+        model = model or self.model
+        headers, payload = self._build_request(_as_dicts(messages), model, temperature, max_tokens, stream)
+        
+        if stream:
+            return self._stream_response_async(headers, payload)
+        
+        try:
+            response = await self._send_async(headers, payload)
+            return self._parse_response(response.json(), model)
+        
+        except Exception as e:
+            logger.error(f"{self.NAME} API error: {str(e)}")
+            raise
+    
+    def _send(
+        self,
+        headers: Dict,
+        payload: Dict,
+        stream: bool = False
+    ) -> httpx.Response:
+        """
+        POST to the provider, retrying rate limited and transient failures.
+        
+        Retries reuse the pooled keep-alive connections. A streamed response
+        is returned open (and must be closed by the caller); retries only
+        ever happen before any of its content was read.
+        """
+        request = self._http.build_request(
+            "POST",
+            self.BASE_URL,
+            headers=headers,
+            content=orjson.dumps(payload),  # Content-Type is set by _build_request
+            timeout=120 if stream else 60
+        )
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = self._http.send(request, stream=stream)
+                if response.is_error:
+                    response.close()
+                response.raise_for_status()
+                return response
+            
+            except Exception as e:
+                if attempt == self.MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(e, attempt)
+                logger.warning(f"{self.NAME} request failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    async def _send_async(
+        self,
+        headers: Dict,
+        payload: Dict,
+        stream: bool = False
+    ) -> httpx.Response:
+        """Async variant of _send()."""
+        http = self._async_http.get()
+        request = http.build_request(
+            "POST",
+            self.BASE_URL,
+            headers=headers,
+            content=orjson.dumps(payload),  # Content-Type is set by _build_request
+            timeout=120 if stream else 60
+        )
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = await http.send(request, stream=stream)
+                if response.is_error:
+                    await response.aclose()
+                response.raise_for_status()
+                return response
+            
+            except Exception as e:
+                if attempt == self.MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(e, attempt)
+                logger.warning(f"{self.NAME} request failed ({str(e)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    def _stream_response(
+        self,
+        headers: Dict,
+        payload: Dict
+    ) -> Generator[str, None, None]:
+        """Stream response content in coalesced chunks."""
+        try:
+            response = self._send(headers, payload, stream=True)
+            try:
+                # Split the raw byte stream into lines ourselves so SSE
+                # events are never decoded to str before orjson parses them
+                pending = b''
+                deltas = _DeltaBuffer()
+                for chunk in response.iter_bytes():
+                    lines, pending = _split_lines(pending, chunk)
+                    for line in lines:
+                        text = deltas.add(self._parse_stream_line(line))
+                        if text:
+                            yield text
+                
+                # The last event may lack a trailing newline; add() can flush it
+                tail = deltas.add(self._parse_stream_line(pending))
+                if tail:
+                    yield tail
+                text = deltas.flush()
+                if text:
+                    yield text
+            finally:
+                response.close()
+        
+        except Exception as e:
+            logger.error(f"{self.NAME} streaming error: {str(e)}")
+            raise
+    
+    async def _stream_response_async(
+        self,
+        headers: Dict,
+        payload: Dict
+    ) -> AsyncGenerator[str, None]:
+        """Stream response content in coalesced chunks without blocking the event loop."""
+        try:
+            response = await self._send_async(headers, payload, stream=True)
+            try:
+                # Split the raw byte stream into lines ourselves so SSE
+                # events are never decoded to str before orjson parses them
+                pending = b''
+                deltas = _DeltaBuffer()
+                async for chunk in response.aiter_bytes():
+                    lines, pending = _split_lines(pending, chunk)
+                    for line in lines:
+                        text = deltas.add(self._parse_stream_line(line))
+                        if text:
+                            yield text
+                
+                # The last event may lack a trailing newline; add() can flush it
+                tail = deltas.add(self._parse_stream_line(pending))
+                if tail:
+                    yield tail
+                text = deltas.flush()
+                if text:
+                    yield text
+            finally:
+                await response.aclose()
+        
+        except Exception as e:
+            logger.error(f"{self.NAME} streaming error: {str(e)}")
+            raise
 
 
 class QwenClient(BaseLLMClient):
@@ -82,31 +449,28 @@ class QwenClient(BaseLLMClient):
     """
     
     BASE_URL = "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
+    NAME = "Qwen"
     
-    def __init__(self, api_key: str, model: str = "qwen-plus"):
-        self.api_key = api_key
-        self.model = model
+    def __init__(self, api_key: str, model: str = "qwen-plus", **kwargs):
+        super().__init__(api_key, model, **kwargs)
     
-    def chat(
+    def _build_request(
         self,
-        messages: List[Message],
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
-        stream: bool = False
-    ) -> Union[LLMResponse, Generator[str, None, None]]:
-        """Send chat completion to Qwen."""
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool
+    ) -> Tuple[Dict, Dict]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
         payload = {
-            "model": self.model,
+            "model": model,
             "input": {
-                "messages": [
-                    {"role": m.role, "content": m.content}
-                    for m in messages
-                ]
+                "messages": messages
             },
             "parameters": {
                 "temperature": temperature,
@@ -116,73 +480,36 @@ class QwenClient(BaseLLMClient):
         }
         
         if stream:
+            headers["X-DashScope-SSE"] = "enable"
             payload["parameters"]["incremental_output"] = True
-            return self._stream_response(headers, payload)
         
-        try:
-            response = requests.post(
-                self.BASE_URL,
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            response.raise_for_status()
-            data = response.json()
-            
+        return headers, payload
+    
+    def _parse_response(self, data: Dict, model: str) -> LLMResponse:
+        output = data.get("output", {})
+        choices = output.get("choices", [{}])
+        message = choices[0].get("message", {}) if choices else {}
+        usage = data.get("usage", {})
+        
+        return LLMResponse(
+            content=message.get("content", ""),
+            tokens_used=usage.get("total_tokens", 0),
+            model=model,
+            finish_reason=output.get("finish_reason", "")
+        )
+    
+    def _parse_stream_line(self, line: bytes) -> Optional[str]:
+        if line.startswith(b'data:'):
+            data = orjson.loads(line[5:])
             output = data.get("output", {})
             choices = output.get("choices", [{}])
-            message = choices[0].get("message", {}) if choices else {}
-            usage = data.get("usage", {})
-            
-            return LLMResponse(
-                content=message.get("content", ""),
-                tokens_used=usage.get("total_tokens", 0),
-                model=self.model,
-                finish_reason=output.get("finish_reason", "")
-            )
-        
-        except Exception as e:
-            logger.error(f"Qwen API error: {str(e)}")
-            raise
-    
-    def _stream_response(
-        self,
-        headers: Dict,
-        payload: Dict
-    ) -> Generator[str, None, None]:
-        """Stream response from Qwen."""
-        headers["X-DashScope-SSE"] = "enable"
-        
-        try:
-            response = requests.post(
-                self.BASE_URL,
-                headers=headers,
-                json=payload,
-                stream=True,
-                timeout=120
-            )
-            response.raise_for_status()
-            
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data:'):
-                        import json
-                        data = json.loads(line[5:])
-                        output = data.get("output", {})
-                        choices = output.get("choices", [{}])
-                        if choices:
-                            content = choices[0].get("message", {}).get("content", "")
-                            if content:
-                                yield content
-        
-        except Exception as e:
-            logger.error(f"Qwen streaming error: {str(e)}")
-            raise
+            if choices:
+                return choices[0].get("message", {}).get("content", "")
+        return None
     
     def chat_with_deep_thought(
         self,
-        messages: List[Message],
+        messages: List[Dict[str, str]],
         max_tokens: int = 4096
     ) -> LLMResponse:
         """
@@ -191,9 +518,9 @@ class QwenClient(BaseLLMClient):
         Uses a chain-of-thought prompt to encourage detailed reasoning.
         """
         # Prepend system message for deep thinking
-        system_msg = Message(
-            role="system",
-            content=(
+        system_msg = {
+            "role": "system",
+            "content": (
                 "You are a research assistant with deep analytical capabilities. "
                 "For this query, think step by step:\n"
                 "1. First, analyze the question carefully\n"
@@ -202,7 +529,7 @@ class QwenClient(BaseLLMClient):
                 "4. Synthesize your findings into a comprehensive answer\n"
                 "Show your reasoning process before giving the final answer."
             )
-        )
+        }
         
         enhanced_messages = [system_msg] + messages
         
@@ -216,14 +543,17 @@ class QwenClient(BaseLLMClient):
         content = response.content
         thinking = None
         
-        if "Final Answer:" in content:
-            parts = content.split("Final Answer:", 1)
-            thinking = parts[0].strip()
-            content = parts[1].strip()
-        elif "Therefore:" in content:
-            parts = content.split("Therefore:", 1)
-            thinking = parts[0].strip()
-            content = "Therefore: " + parts[1].strip()
+        # partition finds and splits in a single pass; "Final Answer:" wins
+        # over an earlier "Therefore:"
+        before, marker, after = content.partition("Final Answer:")
+        if marker:
+            thinking = before.strip()
+            content = after.strip()
+        else:
+            before, marker, after = content.partition("Therefore:")
+            if marker:
+                thinking = before.strip()
+                content = "Therefore: " + after.strip()
         
         response.thinking_content = thinking
         response.content = content
@@ -242,99 +572,58 @@ class DeepSeekClient(BaseLLMClient):
     """
     
     BASE_URL = "https://api.deepseek.com/v1/chat/completions"
+    NAME = "DeepSeek"
     
-    def __init__(self, api_key: str, model: str = "deepseek-chat"):
-        self.api_key = api_key
-        self.model = model
+    def __init__(self, api_key: str, model: str = "deepseek-chat", **kwargs):
+        super().__init__(api_key, model, **kwargs)
     
-    def chat(
+    def _build_request(
         self,
-        messages: List[Message],
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
-        stream: bool = False
-    ) -> Union[LLMResponse, Generator[str, None, None]]:
-        """Send chat completion to DeepSeek."""
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool
+    ) -> Tuple[Dict, Dict]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
         payload = {
-            "model": self.model,
-            "messages": [
-                {"role": m.role, "content": m.content}
-                for m in messages
-            ],
+            "model": model,
+            "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
             "stream": stream
         }
         
-        if stream:
-            return self._stream_response(headers, payload)
-        
-        try:
-            response = requests.post(
-                self.BASE_URL,
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            choice = data.get("choices", [{}])[0]
-            message = choice.get("message", {})
-            usage = data.get("usage", {})
-            
-            return LLMResponse(
-                content=message.get("content", ""),
-                tokens_used=usage.get("total_tokens", 0),
-                model=self.model,
-                finish_reason=choice.get("finish_reason", "")
-            )
-        
-        except Exception as e:
-            logger.error(f"DeepSeek API error: {str(e)}")
-            raise
+        return headers, payload
     
-    def _stream_response(
-        self,
-        headers: Dict,
-        payload: Dict
-    ) -> Generator[str, None, None]:
-        """Stream response from DeepSeek."""
-        try:
-            response = requests.post(
-                self.BASE_URL,
-                headers=headers,
-                json=payload,
-                stream=True,
-                timeout=120
-            )
-            response.raise_for_status()
-            
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data:') and line != 'data: [DONE]':
-                        import json
-                        data = json.loads(line[5:])
-                        choices = data.get("choices", [{}])
-                        if choices:
-                            delta = choices[0].get("delta", {})
-                            content = delta.get("content", "")
-                            if content:
-                                yield content
-        
-        except Exception as e:
-            logger.error(f"DeepSeek streaming error: {str(e)}")
-            raise
+    def _parse_response(self, data: Dict, model: str) -> LLMResponse:
+        choice = data.get("choices", [{}])[0]
+        message = choice.get("message", {})
+        usage = data.get("usage", {})
+        
+        return LLMResponse(
+            content=message.get("content", ""),
+            tokens_used=usage.get("total_tokens", 0),
+            model=model,
+            finish_reason=choice.get("finish_reason", "")
+        )
+    
+    def _parse_stream_line(self, line: bytes) -> Optional[str]:
+        if line.startswith(b'data:') and not line.startswith(b'data: [DONE]'):
+            data = orjson.loads(line[5:])
+            choices = data.get("choices", [{}])
+            if choices:
+                delta = choices[0].get("delta", {})
+                return delta.get("content", "")
+        return None
     
     def chat_with_deep_thought(
         self,
-        messages: List[Message],
+        messages: List[Dict[str, str]],
         max_tokens: int = 4096
     ) -> LLMResponse:
         """
@@ -342,29 +631,25 @@ class DeepSeekClient(BaseLLMClient):
         
         DeepSeek-Reasoner is specifically designed for complex reasoning tasks.
         """
-        # Use reasoning model if available
-        original_model = self.model
-        self.model = "deepseek-reasoner"
-        
-        try:
-            # Add reasoning instruction
-            enhanced_messages = messages.copy()
-            if enhanced_messages and enhanced_messages[0].role != "system":
-                enhanced_messages.insert(0, Message(
-                    role="system",
-                    content="Think deeply and reason step by step. Show your reasoning process."
-                ))
-            
-            response = self.chat(
-                messages=enhanced_messages,
-                temperature=0.2,
-                max_tokens=max_tokens
-            )
-            
-            return response
-        
-        finally:
-            self.model = original_model
+        # Add reasoning instruction unless the caller supplied a system prompt
+        enhanced_messages = _as_dicts(messages)
+        if enhanced_messages and enhanced_messages[0]["role"] != "system":
+            enhanced_messages = [
+                {
+                    "role": "system",
+                    "content": "Think deeply and reason step by step. Show your reasoning process."
+                },
+                *enhanced_messages
+            ]
+        
+        # Use the reasoning model for this call only; the client is shared
+        # across threads, so self.model is never swapped
+        return self.chat(
+            messages=enhanced_messages,
+            temperature=0.2,
+            max_tokens=max_tokens,
+            model="deepseek-reasoner"
+        )
 
 
 class LLMService:
@@ -388,6 +673,11 @@ class LLMService:
     def __init__(self):
         self._clients: Dict[str, BaseLLMClient] = {}
         self._api_keys: Dict[str, str] = {}
+        
+        # One connection pool per transport (per event loop for async),
+        # shared by all provider clients
+        self._http = httpx.Client(limits=HTTP_LIMITS)
+        self._async_http = _AsyncClientPool()
     
     def set_api_key(self, provider: str, api_key: str, model: str = None):
         """Set API key for a provider with optional model."""
@@ -398,10 +688,14 @@ class LLMService:
         model = model or self.DEFAULT_MODELS.get(provider, 'default')
         
         # Create or update client
+        transports = {
+            'http_client': self._http,
+            'async_http_clients': self._async_http
+        }
         if provider == 'qwen':
-            self._clients[provider] = QwenClient(api_key, model=model)
+            self._clients[provider] = QwenClient(api_key, model=model, **transports)
         elif provider == 'deepseek':
-            self._clients[provider] = DeepSeekClient(api_key, model=model)
+            self._clients[provider] = DeepSeekClient(api_key, model=model, **transports)
     
     def get_client(self, provider: str, model: str = None) -> BaseLLMClient:
         """Get client for a provider, optionally with a specific model."""
@@ -445,18 +739,115 @@ class LLMService:
         """
         client = self.get_client(provider, model)
         
-        msg_objects = [
-            Message(role=m['role'], content=m['content'])
-            for m in messages
-        ]
-        
         return client.chat(
-            messages=msg_objects,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stream
+        )
+    
+    async def chat_async(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str = "qwen",
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        stream: bool = False
+    ) -> Union[LLMResponse, AsyncGenerator[str, None]]:
+        """
+        Async variant of chat() for callers running an event loop.
+        
+        Returns:
+            LLMResponse, or an async generator when streaming
+        """
+        client = self.get_client(provider, model)
+        
+        return await client.chat_async(
+            messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
             stream=stream
         )
     
+    async def chat_batch(
+        self,
+        list_of_messages: List[List[Dict[str, str]]],
+        provider: str = "qwen",
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        concurrency: int = 16,
+        rate_limit_per_minute: int = None
+    ) -> List[LLMResponse]:
+        """
+        Send many chat completions concurrently.
+        
+        At most `concurrency` requests are in flight; each one retries rate
+        limited (429) and transient errors inside the client.
+        
+        Args:
+            list_of_messages: One message list per request
+            provider: LLM provider
+            model: Specific model to use
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens per response
+            concurrency: Maximum concurrent requests
+            rate_limit_per_minute: Optional requests-per-minute cap
+            
+        Returns:
+            LLMResponses in the order of list_of_messages
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        limiter = _RateLimiter(rate_limit_per_minute) if rate_limit_per_minute else None
+        
+        async def run(messages: List[Dict[str, str]]) -> LLMResponse:
+            async with semaphore:
+                if limiter:
+                    await asyncio.sleep(limiter.reserve())
+                return await self.chat_async(
+                    messages,
+                    provider=provider,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+        
+        return list(await asyncio.gather(*(run(m) for m in list_of_messages)))
+    
+    def chat_batch_sync(
+        self,
+        list_of_messages: List[List[Dict[str, str]]],
+        provider: str = "qwen",
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        concurrency: int = 16,
+        rate_limit_per_minute: int = None
+    ) -> List[LLMResponse]:
+        """
+        Blocking variant of chat_batch() for code without an event loop.
+        
+        Fans out over a thread pool on the pooled sync client, whose
+        keep-alive connections outlive the call; a fresh asyncio.run() per
+        call would open a new async client and new connections each time.
+        """
+        limiter = _RateLimiter(rate_limit_per_minute) if rate_limit_per_minute else None
+        
+        def run(messages: List[Dict[str, str]]) -> LLMResponse:
+            if limiter:
+                time.sleep(limiter.reserve())
+            return self.chat(
+                messages,
+                provider=provider,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            return list(executor.map(run, list_of_messages))
+    
     def chat_with_deep_thought(
         self,
         messages: List[Dict[str, str]],
@@ -478,13 +869,8 @@ class LLMService:
         """
         client = self.get_client(provider, model)
         
-        msg_objects = [
-            Message(role=m['role'], content=m['content'])
-            for m in messages
-        ]
-        
         return client.chat_with_deep_thought(
-            messages=msg_objects,
+            messages=messages,
             max_tokens=max_tokens
         )
     
@@ -529,11 +915,15 @@ class LLMService:
 
 # Singleton instance
 _llm_service = None
+_llm_service_lock = threading.Lock()
 
 
 def get_llm_service() -> LLMService:
-    """Get or create the LLM service singleton."""
+    """Get or create the LLM service singleton (thread-safe)."""
     global _llm_service
     if _llm_service is None:
-        _llm_service = LLMService()
+        with _llm_service_lock:
+            # Double-checked locking pattern
+            if _llm_service is None:
+                _llm_service = LLMService()
     return _llm_service
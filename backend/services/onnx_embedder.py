@@ -0,0 +1,110 @@
+"""
+ONNX Runtime Embedder
+
+This module provides a CPU embedding backend built on a dynamically
+int8-quantized ONNX export of a sentence-transformers model. On CPU-only
+hosts it is several times faster than fp32 PyTorch: int8 GEMMs use the
+VNNI instructions of modern x86 CPUs, and ONNX Runtime fuses the
+transformer's LayerNorm/GELU subgraphs.
+
+The model is exported and quantized once, then loaded from ONNX_MODEL_DIR
+(default './data/onnx_models') on later runs. Requires optimum[onnxruntime];
+callers import this module lazily and fall back to PyTorch without it.
+"""
+
+import os
+import logging
+from typing import List
+
+import numpy as np
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbedder:
+    """
+    Mean-pooled, L2-normalized sentence embeddings from an int8 ONNX model.
+    
+    Matches the output of sentence-transformers models whose pipeline is
+    Transformer -> mean Pooling -> Normalize (e.g. all-MiniLM-L6-v2), up to
+    quantization error.
+    
+    Usage:
+        embedder = OnnxEmbedder("sentence-transformers/all-MiniLM-L6-v2")
+        vectors = embedder.encode(texts)
+    """
+    
+    # Matches the sentence-transformers max_seq_length of the MiniLM models
+    MAX_LENGTH = 256
+    
+    def __init__(self, model_name: str, cache_dir: str = None):
+        """
+        Load the quantized model, exporting and quantizing it on first use.
+        
+        Args:
+            model_name: HuggingFace model name
+            cache_dir: Directory for exported models. Defaults to
+                       ONNX_MODEL_DIR or './data/onnx_models'
+        """
+        cache_dir = cache_dir or os.getenv('ONNX_MODEL_DIR', './data/onnx_models')
+        save_dir = os.path.join(cache_dir, model_name.replace('/', '__') + '-int8')
+        
+        if not os.path.exists(os.path.join(save_dir, 'model_quantized.onnx')):
+            logger.info(f"Exporting and quantizing {model_name} to {save_dir}")
+            fp32_model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name,
+                export=True,
+                provider='CPUExecutionProvider'
+            )
+            quantizer = ORTQuantizer.from_pretrained(fp32_model)
+            quantizer.quantize(
+                save_dir=save_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(
+                    is_static=False,
+                    per_channel=False
+                )
+            )
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(save_dir)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            save_dir,
+            file_name='model_quantized.onnx',
+            provider='CPUExecutionProvider'
+        )
+    
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Embed texts.
+        
+        Args:
+            texts: List of text strings
+            batch_size: Texts per ONNX Runtime call
+        
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.empty((0, self.model.config.hidden_size), dtype=np.float32)
+        
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.MAX_LENGTH,
+                return_tensors='np'
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            
+            # Mean pooling over real tokens, then L2-normalize like the
+            # sentence-transformers pipeline does
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            outputs.append(pooled.astype(np.float32, copy=False))
+        return np.concatenate(outputs)
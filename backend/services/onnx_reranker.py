@@ -0,0 +1,110 @@
+"""
+ONNX Runtime Reranker
+
+This module provides a CPU cross-encoder backend built on a dynamically
+int8-quantized ONNX export of a sentence-transformers CrossEncoder model.
+Reranking is the dominant CPU cost of retrieval; int8 GEMMs on VNNI-capable
+x86 CPUs score candidate pairs several times faster than fp32 PyTorch with
+negligible ranking quality loss.
+
+The model is exported and quantized once, then loaded from ONNX_MODEL_DIR
+(default './data/onnx_models') on later runs. Requires optimum[onnxruntime];
+callers import this module lazily and fall back to PyTorch without it.
+"""
+
+import os
+import logging
+from typing import List, Tuple
+
+import numpy as np
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxCrossEncoder:
+    """
+    Cross-encoder relevance scores from an int8 ONNX model.
+    
+    Drop-in for CrossEncoder.predict: returns one score per (query, passage)
+    pair, with the activation the model was trained with (identity logits
+    for the ms-marco MiniLM rerankers).
+    
+    Usage:
+        reranker = OnnxCrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+        scores = reranker.predict([(query, passage), ...])
+    """
+    
+    MAX_LENGTH = 512
+    
+    def __init__(self, model_name: str, cache_dir: str = None):
+        """
+        Load the quantized model, exporting and quantizing it on first use.
+        
+        Args:
+            model_name: HuggingFace model name
+            cache_dir: Directory for exported models. Defaults to
+                       ONNX_MODEL_DIR or './data/onnx_models'
+        """
+        cache_dir = cache_dir or os.getenv('ONNX_MODEL_DIR', './data/onnx_models')
+        save_dir = os.path.join(cache_dir, model_name.replace('/', '__') + '-int8')
+        
+        if not os.path.exists(os.path.join(save_dir, 'model_quantized.onnx')):
+            logger.info(f"Exporting and quantizing {model_name} to {save_dir}")
+            fp32_model = ORTModelForSequenceClassification.from_pretrained(
+                model_name,
+                export=True,
+                provider='CPUExecutionProvider'
+            )
+            quantizer = ORTQuantizer.from_pretrained(fp32_model)
+            quantizer.quantize(
+                save_dir=save_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(
+                    is_static=False,
+                    per_channel=True
+                )
+            )
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(save_dir)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        self.model = ORTModelForSequenceClassification.from_pretrained(
+            save_dir,
+            file_name='model_quantized.onnx',
+            provider='CPUExecutionProvider'
+        )
+        
+        # sentence-transformers records the activation in the model config
+        activation = getattr(self.model.config, 'sbert_ce_default_activation_function', None) or ''
+        self._apply_sigmoid = activation.endswith('Sigmoid')
+    
+    def predict(self, pairs: List[Tuple[str, str]], batch_size: int = 8) -> np.ndarray:
+        """
+        Score (query, passage) pairs.
+        
+        Args:
+            pairs: List of (query, passage) tuples
+            batch_size: Pairs per ONNX Runtime call
+        
+        Returns:
+            float32 array of shape (len(pairs),)
+        """
+        scores = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            inputs = self.tokenizer(
+                [query for query, _ in batch],
+                [passage for _, passage in batch],
+                padding=True,
+                truncation='only_second',
+                max_length=self.MAX_LENGTH,
+                return_tensors='np'
+            )
+            logits = self.model(**inputs).logits[:, 0]
+            scores.append(logits.astype(np.float32, copy=False))
+        
+        scores = np.concatenate(scores) if scores else np.empty(0, dtype=np.float32)
+        if self._apply_sigmoid:
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        return scores
@@ -9,18 +9,131 @@ This module implements hybrid retrieval with cross-encoder reranking:
 The service enforces user_id isolation for all retrievals.
 """
 
+import os
+import time
+import heapq
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer, CrossEncoder
 
 from database.chroma_client import ChromaDBClient
-from services.ingestion import IngestionService, get_ingestion_service
+from services.ingestion import (
+    IngestionService,
+    get_ingestion_service,
+    load_embedding_model,
+    load_onnx_embedder
+)
+
+if TYPE_CHECKING:
+    from services.onnx_embedder import OnnxEmbedder
+    from services.onnx_reranker import OnnxCrossEncoder
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4)
+def _load_onnx_reranker(model_name: str) -> Optional['OnnxCrossEncoder']:
+    """Load the int8 ONNX reranker once per process, or None if unavailable."""
+    try:
+        from services.onnx_reranker import OnnxCrossEncoder
+        return OnnxCrossEncoder(model_name)
+    except ImportError:
+        logger.warning("optimum[onnxruntime] not installed, using PyTorch reranker on CPU")
+    except Exception as e:
+        logger.warning(f"ONNX export of {model_name} failed, using PyTorch reranker on CPU: {str(e)}")
+    return None
+
+
+class _LRUCache:
+    """Small thread-safe LRU mapping."""
+    
+    def __init__(self, maxsize: int):
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+class _SemanticCache:
+    """
+    Near-duplicate query cache.
+    
+    Entries are (scope, unit query embedding, value). A lookup is one
+    matrix-vector product over all entries and hits when an unexpired entry
+    of the same scope has cosine similarity >= threshold. When full, the
+    least recently used entry is replaced.
+    """
+    
+    def __init__(self, maxsize: int, threshold: float, ttl: float):
+        self._maxsize = maxsize
+        self._threshold = threshold
+        self._ttl = ttl
+        self._embeddings: Optional[np.ndarray] = None  # (maxsize, dim), allocated on first put
+        self._scopes: List[Any] = [None] * maxsize
+        self._values: List[Any] = [None] * maxsize
+        self._expires = np.zeros(maxsize)  # monotonic deadline; 0 marks an empty slot
+        self._last_used = np.zeros(maxsize)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+    
+    def get(self, scope: Any, embedding: np.ndarray) -> Any:
+        if self._embeddings is None:
+            return None
+        query = self._unit(embedding)
+        with self._lock:
+            now = time.monotonic()
+            similarities = self._embeddings @ query
+            similarities[self._expires <= now] = -np.inf
+            rows = np.flatnonzero(similarities >= self._threshold)
+            for row in rows[np.argsort(-similarities[rows])]:
+                if self._scopes[row] == scope:
+                    self._last_used[row] = now
+                    return self._values[row]
+        return None
+    
+    def put(self, scope: Any, embedding: np.ndarray, value: Any) -> None:
+        unit = self._unit(embedding)
+        with self._lock:
+            now = time.monotonic()
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self._maxsize, unit.shape[0]), dtype=np.float32)
+            
+            # Reuse an empty or expired slot, else the least recently used
+            free = np.flatnonzero(self._expires <= now)
+            row = int(free[0]) if len(free) else int(np.argmin(self._last_used))
+            
+            self._embeddings[row] = unit
+            self._scopes[row] = scope
+            self._values[row] = value
+            self._expires[row] = now + self._ttl
+            self._last_used[row] = now
+
+
 @dataclass
 class RetrievedChunk:
     """Represents a retrieved document chunk with metadata."""
@@ -57,6 +170,20 @@ class RetrievalService:
     # Retrieval parameters
     DEFAULT_TOP_K = 5
     DEFAULT_CANDIDATES = 20  # Retrieve more candidates for reranking
+    MAX_CANDIDATES = 200
+    RERANK_BATCH_SIZE = 8  # Pairs are length-sorted, so small batches pad little
+    
+    # LRU sizes for repeated queries (UI refreshes, retries)
+    QUERY_CACHE_SIZE = 1024
+    RERANK_CACHE_SIZE = 4096
+    
+    QUERY_BATCH_SIZE = 32
+    
+    # Near-duplicate query cache in front of retrieve(): entries are scoped
+    # by user, knowledge base version and retrieval parameters
+    SEMANTIC_CACHE_SIZE = 512
+    SEMANTIC_CACHE_THRESHOLD = 0.97
+    SEMANTIC_CACHE_TTL = 300.0  # seconds; bounds staleness across processes
     
     def __init__(
         self,
@@ -76,26 +203,54 @@ class RetrievalService:
         self.reranker_model_name = reranker_model or self.DEFAULT_RERANKER_MODEL
         self.use_reranking = use_reranking
         
+        # Must match ingestion so queries and chunks share an embedding space
+        self.use_onnx_on_cpu = os.getenv('EMBEDDING_ONNX_ON_CPU', '1') == '1'
+        self.use_onnx_reranker_on_cpu = os.getenv('RERANKER_ONNX_ON_CPU', '1') == '1'
+        self.use_semantic_cache = os.getenv('RETRIEVAL_SEMANTIC_CACHE', '1') == '1'
+        
         # Lazy initialization
         self._embedding_model = None
         self._reranker = None
         self._chroma_client = None
         self._ingestion_service = None
+        
+        # query -> embedding, and (query, passage) -> rerank score
+        self._query_cache = _LRUCache(self.QUERY_CACHE_SIZE)
+        self._rerank_cache = _LRUCache(self.RERANK_CACHE_SIZE)
+        self._semantic_cache = _SemanticCache(
+            self.SEMANTIC_CACHE_SIZE,
+            self.SEMANTIC_CACHE_THRESHOLD,
+            self.SEMANTIC_CACHE_TTL
+        )
     
     @property
     def embedding_model(self) -> SentenceTransformer:
         """Lazy load embedding model."""
         if self._embedding_model is None:
-            logger.info(f"Loading embedding model: {self.embedding_model_name}")
-            self._embedding_model = SentenceTransformer(self.embedding_model_name)
+            # Same instance the ingestion service uses for this model
+            self._embedding_model = load_embedding_model(self.embedding_model_name)
         return self._embedding_model
     
     @property
-    def reranker(self) -> CrossEncoder:
-        """Lazy load cross-encoder reranker."""
+    def onnx_embedder(self) -> Optional['OnnxEmbedder']:
+        """Int8 ONNX embedder for CPU-only hosts, or None to use PyTorch."""
+        if not self.use_onnx_on_cpu or torch.cuda.is_available():
+            return None
+        return load_onnx_embedder(self.embedding_model_name)
+    
+    @property
+    def reranker(self) -> Union[CrossEncoder, 'OnnxCrossEncoder']:
+        """
+        Lazy load cross-encoder reranker.
+        
+        CPU-only hosts use an int8 ONNX export when available.
+        """
         if self._reranker is None and self.use_reranking:
-            logger.info(f"Loading reranker model: {self.reranker_model_name}")
-            self._reranker = CrossEncoder(self.reranker_model_name)
+            if self.use_onnx_reranker_on_cpu and not torch.cuda.is_available():
+                self._reranker = _load_onnx_reranker(self.reranker_model_name)
+            if self._reranker is None:
+                logger.info(f"Loading reranker model: {self.reranker_model_name}")
+                self._reranker = CrossEncoder(self.reranker_model_name)
         return self._reranker
     
     @property
@@ -112,13 +267,30 @@ class RetrievalService:
             self._ingestion_service = get_ingestion_service()
         return self._ingestion_service
     
+    def warmup(self) -> None:
+        """
+        Load the query embedding and reranker models ahead of the first query.
+        
+        Runs one dummy embedding and one dummy rerank so weights, the CUDA
+        context and kernel selection are all paid for up front.
+        """
+        logger.info("Warming up retrieval service")
+        try:
+            self._embed_query("warmup")
+            if self.reranker:
+                self.reranker.predict([("warmup", "warmup")])
+        except Exception as e:
+            # Not fatal: anything not loaded here loads on first use
+            logger.warning(f"Retrieval warmup failed: {str(e)}")
+    
     def retrieve(
         self,
         query: str,
         user_id: int,
         top_k: int = None,
         doc_ids: List[int] = None,
-        apply_reranking: bool = None
+        apply_reranking: bool = None,
+        query_embedding: np.ndarray = None
     ) -> List[RetrievedChunk]:
         """
         Retrieve relevant chunks for a query.
@@ -129,6 +301,7 @@ class RetrievalService:
             top_k: Number of results to return
             doc_ids: Optional list of document IDs to filter
             apply_reranking: Override default reranking setting
+            query_embedding: Precomputed embedding of query
             
         Returns:
             List of RetrievedChunk objects, sorted by relevance
@@ -137,10 +310,26 @@ class RetrievalService:
         should_rerank = apply_reranking if apply_reranking is not None else self.use_reranking
         
         # Get more candidates if reranking
-        n_candidates = self.DEFAULT_CANDIDATES if should_rerank else top_k
+        n_candidates = self._candidate_count(top_k) if should_rerank else top_k
         
         # Step 1: Generate query embedding
-        query_embedding = self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = self._embed_query(query)
+        
+        # Serve near-duplicates of recent queries with the same parameters
+        # from cache; the knowledge base version invalidates on any change
+        cache_scope = None
+        if self.use_semantic_cache:
+            cache_scope = (
+                user_id,
+                self.chroma_client.knowledge_base_version(user_id),
+                tuple(sorted(doc_ids)) if doc_ids else None,
+                top_k,
+                should_rerank
+            )
+            cached = self._semantic_cache.get(cache_scope, query_embedding)
+            if cached is not None:
+                return list(cached)
         
         # Step 2: Retrieve candidates from ChromaDB
         candidates = self._semantic_search(
@@ -153,12 +342,61 @@ class RetrievalService:
         if not candidates:
             return []
         
-        # Step 3: Apply reranking if enabled
+        # Step 3: Apply reranking if enabled, and keep the top-k
+        if should_rerank and self.reranker:
+            results = self._rerank(query, candidates, top_k)
+        else:
+            results = candidates[:top_k]
+        
+        if cache_scope is not None:
+            self._semantic_cache.put(cache_scope, query_embedding, tuple(results))
+        return results
+    
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        user_id: int,
+        top_k: int = None,
+        doc_ids: List[int] = None,
+        apply_reranking: bool = None
+    ) -> List[List[RetrievedChunk]]:
+        """
+        Retrieve relevant chunks for several queries at once.
+        
+        Equivalent to calling retrieve() per query, but embeds all queries
+        in one forward pass, searches ChromaDB with one multi-query call and
+        scores every (query, candidate) pair in one reranker pass.
+        
+        Args:
+            queries: Search queries
+            user_id: User ID for isolation
+            top_k: Number of results to return per query
+            doc_ids: Optional list of document IDs to filter
+            apply_reranking: Override default reranking setting
+            
+        Returns:
+            One list of RetrievedChunk objects per query, sorted by relevance
+        """
+        if not queries:
+            return []
+        
+        top_k = top_k or self.DEFAULT_TOP_K
+        should_rerank = apply_reranking if apply_reranking is not None else self.use_reranking
+        n_candidates = self._candidate_count(top_k) if should_rerank else top_k
+        
+        query_embeddings = self._embed_queries(queries)
+        
+        candidate_lists = self._semantic_search_batch(
+            query_embeddings=query_embeddings,
+            user_id=user_id,
+            n_results=n_candidates,
+            doc_ids=doc_ids
+        )
+        
         if should_rerank and self.reranker:
-            candidates = self._rerank(query, candidates)
+            return self._rerank_batch(queries, candidate_lists, top_k)
         
-        # Return top-k
-        return candidates[:top_k]
+        return [candidates[:top_k] for candidates in candidate_lists]
     
     def retrieve_with_context(
         self,
@@ -166,7 +404,8 @@ class RetrievalService:
         user_id: int,
         top_k: int = None,
         doc_ids: List[int] = None,
-        include_neighbors: bool = True
+        include_neighbors: bool = True,
+        query_embedding: np.ndarray = None
     ) -> Tuple[List[RetrievedChunk], str]:
         """
         Retrieve chunks and format as context for LLM.
@@ -177,6 +416,7 @@ class RetrievalService:
             top_k: Number of results
             doc_ids: Optional document filter
             include_neighbors: Include adjacent chunks
+            query_embedding: Precomputed embedding of query
             
         Returns:
             Tuple of (chunks, formatted_context_string)
@@ -185,7 +425,8 @@ class RetrievalService:
             query=query,
             user_id=user_id,
             top_k=top_k,
-            doc_ids=doc_ids
+            doc_ids=doc_ids,
+            query_embedding=query_embedding
         )
         
         if not chunks:
@@ -194,27 +435,59 @@ class RetrievalService:
         # Format context
         context_parts = []
         for i, chunk in enumerate(chunks, 1):
-            source_info = f"[Source: {chunk.source}"
-            if chunk.page:
-                source_info += f", Page {chunk.page}"
-            source_info += "]"
-            
+            page_info = f", Page {chunk.page}" if chunk.page else ""
             context_parts.append(
-                f"--- Document {i} {source_info} ---\n{chunk.text}\n"
+                f"--- Document {i} [Source: {chunk.source}{page_info}] ---\n{chunk.text}\n"
             )
         
         formatted_context = "\n".join(context_parts)
         
         return chunks, formatted_context
     
-    def _embed_query(self, query: str) -> List[float]:
-        """Generate embedding for query."""
-        embedding = self.embedding_model.encode(query, convert_to_numpy=True)
-        return embedding.tolist()
+    def _candidate_count(self, top_k: int) -> int:
+        """
+        Candidates to fetch for reranking: at least 4x top_k so the reranker
+        has a real pool to choose from when many results are requested.
+        """
+        return min(self.MAX_CANDIDATES, max(self.DEFAULT_CANDIDATES, 4 * top_k))
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """
+        Generate embedding for query (LRU cached per query string).
+        
+        Returned as a read-only array: ChromaDB takes arrays directly, so
+        there is no need to box every component into a Python float.
+        """
+        return self._embed_queries([query])[0]
+    
+    def _embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Embed queries, encoding all cache misses in one batch."""
+        embeddings = [self._query_cache.get(query) for query in queries]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing:
+            onnx_embedder = self.onnx_embedder
+            texts = [queries[i] for i in missing]
+            if onnx_embedder is not None:
+                encoded = onnx_embedder.encode(texts, self.QUERY_BATCH_SIZE)
+            else:
+                encoded = self.embedding_model.encode(
+                    texts,
+                    batch_size=self.QUERY_BATCH_SIZE,
+                    convert_to_numpy=True
+                )
+            
+            # Shared by every caller of this query, so make it immutable
+            encoded.flags.writeable = False
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                self._query_cache.put(queries[i], embedding)
+        
+        return embeddings
     
     def _semantic_search(
         self,
-        query_embedding: List[float],
+        query_embedding: np.ndarray,
         user_id: int,
         n_results: int,
         doc_ids: List[int] = None
@@ -231,22 +504,50 @@ class RetrievalService:
         Returns:
             List of RetrievedChunk objects
         """
-        results = self.chroma_client.query_knowledge_base(
+        return self._semantic_search_batch(
+            query_embeddings=[query_embedding],
             user_id=user_id,
-            query_embedding=query_embedding,
+            n_results=n_results,
+            doc_ids=doc_ids
+        )[0]
+    
+    def _semantic_search_batch(
+        self,
+        query_embeddings: List[np.ndarray],
+        user_id: int,
+        n_results: int,
+        doc_ids: List[int] = None
+    ) -> List[List[RetrievedChunk]]:
+        """Semantic search for several query embeddings in one ChromaDB call."""
+        results = self.chroma_client.query_knowledge_base_batch(
+            user_id=user_id,
+            query_embeddings=query_embeddings,
             n_results=n_results,
             doc_ids=doc_ids
         )
         
-        if not results or not results.get('ids') or not results['ids'][0]:
-            return []
+        if not results or not results.get('ids'):
+            return [[] for _ in query_embeddings]
         
+        return [
+            self._to_chunks(
+                results['ids'][row],
+                results['documents'][row],
+                results['distances'][row],
+                results['metadatas'][row]
+            )
+            for row in range(len(query_embeddings))
+        ]
+    
+    @staticmethod
+    def _to_chunks(
+        ids: List[str],
+        documents: List[str],
+        distances: List[float],
+        metadatas: List[Dict[str, Any]]
+    ) -> List[RetrievedChunk]:
+        """Convert one query's ChromaDB results into RetrievedChunks."""
         chunks = []
-        ids = results['ids'][0]
-        documents = results['documents'][0]
-        distances = results['distances'][0]
-        metadatas = results['metadatas'][0]
-        
         for i, (chunk_id, doc_text, distance, metadata) in enumerate(
             zip(ids, documents, distances, metadatas)
         ):
@@ -269,7 +570,8 @@ class RetrievalService:
     def _rerank(
         self,
         query: str,
-        candidates: List[RetrievedChunk]
+        candidates: List[RetrievedChunk],
+        top_k: int = None
     ) -> List[RetrievedChunk]:
         """
         Apply cross-encoder reranking to candidates.
@@ -277,38 +579,61 @@ class RetrievalService:
         Args:
             query: Original query
             candidates: List of candidate chunks
+            top_k: Keep only the best top_k (default: all)
             
         Returns:
             Reranked list of chunks
         """
-        if not candidates:
-            return []
-        
-        # Prepare pairs for cross-encoder
-        pairs = [(query, chunk.text) for chunk in candidates]
-        
-        # Get reranking scores
-        scores = self.reranker.predict(pairs)
-        
-        # Update chunks with rerank scores
-        for chunk, score in zip(candidates, scores):
-            chunk.rerank_score = float(score)
-        
-        # Sort by rerank score (descending)
-        reranked = sorted(
-            candidates,
-            key=lambda x: x.rerank_score,
-            reverse=True
-        )
-        
-        return reranked
+        return self._rerank_batch([query], [candidates], top_k)[0]
+    
+    def _rerank_batch(
+        self,
+        queries: List[str],
+        candidate_lists: List[List[RetrievedChunk]],
+        top_k: int = None
+    ) -> List[List[RetrievedChunk]]:
+        """Rerank each query's candidates, scoring all pairs in one pass."""
+        # Reuse scores of pairs seen before
+        missing = []
+        for query, candidates in zip(queries, candidate_lists):
+            for chunk in candidates:
+                chunk.rerank_score = self._rerank_cache.get((query, chunk.text))
+                if chunk.rerank_score is None:
+                    missing.append((query, chunk))
+        
+        if missing:
+            # Prepare pairs for cross-encoder, shortest first so each batch
+            # pads to a similar length
+            missing.sort(key=lambda pair: len(pair[0]) + len(pair[1].text))
+            pairs = [(query, chunk.text) for query, chunk in missing]
+            
+            # Get reranking scores
+            scores = self.reranker.predict(pairs, batch_size=self.RERANK_BATCH_SIZE)
+            
+            # Update chunks with rerank scores
+            for (query, chunk), score in zip(missing, scores):
+                chunk.rerank_score = float(score)
+                self._rerank_cache.put((query, chunk.text), chunk.rerank_score)
+        
+        # Sort by rerank score (descending); with top_k, partial-sort only
+        # the results that are kept
+        if top_k is None:
+            return [
+                sorted(candidates, key=lambda x: x.rerank_score, reverse=True)
+                for candidates in candidate_lists
+            ]
+        return [
+            heapq.nlargest(top_k, candidates, key=lambda x: x.rerank_score)
+            for candidates in candidate_lists
+        ]
     
     def search_memories(
         self,
         query: str,
         user_id: int,
         n_results: int = 5,
-        memory_type: str = None
+        memory_type: str = None,
+        query_embedding: np.ndarray = None
     ) -> List[Dict[str, Any]]:
         """
         Search long-term memory for relevant past insights.
@@ -318,11 +643,13 @@ class RetrievalService:
             user_id: User ID
             n_results: Number of results
             memory_type: Optional memory type filter
+            query_embedding: Precomputed embedding of query
             
         Returns:
             List of memory entries
         """
-        query_embedding = self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = self._embed_query(query)
         
         results = self.chroma_client.query_memories(
             user_id=user_id,
@@ -381,13 +708,32 @@ class RetrievalService:
             'context': ''
         }
         
-        # Get document chunks
-        chunks, context = self.retrieve_with_context(
-            query=query,
-            user_id=user_id,
-            top_k=top_k,
-            doc_ids=doc_ids
-        )
+        # Embed once for both the document and memory searches
+        query_embedding = self._embed_query(query)
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Search memories on a helper thread while documents are
+            # searched and reranked here (ChromaDB releases the GIL)
+            memories_future = None
+            if include_memories:
+                memories_future = executor.submit(
+                    self.search_memories,
+                    query=query,
+                    user_id=user_id,
+                    n_results=3,
+                    query_embedding=query_embedding
+                )
+            
+            # Get document chunks
+            chunks, context = self.retrieve_with_context(
+                query=query,
+                user_id=user_id,
+                top_k=top_k,
+                doc_ids=doc_ids,
+                query_embedding=query_embedding
+            )
+            
+            memories = memories_future.result() if memories_future else []
         
         result['documents'] = [
             {
@@ -400,32 +746,34 @@ class RetrievalService:
         ]
         result['context'] = context
         
-        # Get memories if requested
+        # Add memories if requested
         if include_memories:
-            memories = self.search_memories(
-                query=query,
-                user_id=user_id,
-                n_results=3
-            )
             result['memories'] = memories
             
             # Add memories to context
             if memories:
-                memory_context = "\n--- Relevant Past Insights ---\n"
-                for mem in memories:
-                    memory_context += f"• {mem['content']}\n"
-                result['context'] += memory_context
+                memory_lines = ["\n--- Relevant Past Insights ---"]
+                memory_lines.extend(f"• {mem['content']}" for mem in memories)
+                result['context'] += "\n".join(memory_lines) + "\n"
         
         return result
 
 
 # Singleton instance
 _retrieval_service = None
+_retrieval_service_lock = threading.Lock()
 
 
 def get_retrieval_service() -> RetrievalService:
-    """Get or create the retrieval service singleton."""
+    """Get or create the retrieval service singleton (thread-safe)."""
     global _retrieval_service
     if _retrieval_service is None:
-        _retrieval_service = RetrievalService()
+        with _retrieval_service_lock:
+            # Double-checked locking pattern
+            if _retrieval_service is None:
+                service = RetrievalService()
+                if os.getenv('WARMUP_ON_START') == '1':
+                    service.warmup()
+                # Publish only once warm so no thread sees a cold service
+                _retrieval_service = service
     return _retrieval_service
@@ -0,0 +1,9 @@
+"""
+Pytest configuration for backend tests.
+"""
+
+import os
+import sys
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,153 @@
+"""
+Tests for JWT authentication utilities.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+from flask import Flask
+
+from utils.auth_utils import _hs256_verifier, decode_token, generate_tokens, init_auth
+
+
+def _make_app(secret_key: str) -> Flask:
+    app = Flask(__name__)
+    app.config.update(
+        JWT_SECRET_KEY=secret_key,
+        JWT_ALGORITHM='HS256',
+        JWT_ACCESS_TOKEN_EXPIRES=timedelta(hours=1),
+        JWT_REFRESH_TOKEN_EXPIRES=timedelta(days=30)
+    )
+    init_auth(app)
+    return app
+
+
+@pytest.fixture
+def app():
+    return _make_app('test-secret-key-with-at-least-32-bytes')
+
+
+def test_tokens_round_trip(app):
+    with app.app_context():
+        access_token, refresh_token = generate_tokens(7, 'alice')
+        access = decode_token(access_token)
+        refresh = decode_token(refresh_token)
+    
+    assert access['user_id'] == 7
+    assert access['username'] == 'alice'
+    assert access['type'] == 'access'
+    assert refresh['type'] == 'refresh'
+
+
+def test_apps_keep_their_own_secret():
+    first = _make_app('first-secret-key-with-at-least-32-bytes')
+    second = _make_app('second-secret-key-with-at-least-32-bytes')
+    
+    with first.app_context():
+        first_token, _ = generate_tokens(1, 'first')
+    with second.app_context():
+        second_token, _ = generate_tokens(2, 'second')
+        assert decode_token(second_token)['user_id'] == 2
+        assert decode_token(first_token) is None
+    with first.app_context():
+        assert decode_token(first_token)['user_id'] == 1
+        assert decode_token(second_token) is None
+
+
+def test_settings_load_lazily_without_init_auth():
+    app = Flask(__name__)
+    app.config.update(
+        JWT_SECRET_KEY='lazy-secret-key-with-at-least-32-bytes',
+        JWT_ALGORITHM='HS256',
+        JWT_ACCESS_TOKEN_EXPIRES=timedelta(hours=1),
+        JWT_REFRESH_TOKEN_EXPIRES=timedelta(days=30)
+    )
+    
+    with app.app_context():
+        access_token, _ = generate_tokens(3, 'lazy')
+        assert decode_token(access_token)['user_id'] == 3
+
+
+# HS256 fast path parity with PyJWT
+
+SECRET = b'parity-secret-key-with-at-least-32-bytes'
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _segment(part) -> bytes:
+    """Raw bytes pass through, so malformed JSON can be signed too."""
+    return _b64url(part if isinstance(part, bytes) else json.dumps(part).encode())
+
+
+def _token(payload, header=None, key: bytes = SECRET, signature: bytes = None) -> str:
+    """Build a JWT by hand so malformed headers and claims can be signed."""
+    header = {'alg': 'HS256', 'typ': 'JWT'} if header is None else header
+    signing_input = _segment(header) + b'.' + _segment(payload)
+    if signature is None:
+        signature = _b64url(hmac.new(key, signing_input, hashlib.sha256).digest())
+    return (signing_input + b'.' + signature).decode()
+
+
+def _outcome(verify, token):
+    """Payload on success, exception type on failure."""
+    try:
+        return verify(token)
+    except Exception as e:
+        return type(e)
+
+
+NOW = int(time.time())
+VALID = {'user_id': 1, 'type': 'access', 'iat': NOW, 'exp': NOW + 3600}
+
+PARITY_CASES = {
+    'valid': _token(VALID),
+    'no_typ_header': _token(VALID, header={'alg': 'HS256'}),
+    'no_claims': _token({'user_id': 1}),
+    'expired': _token({**VALID, 'exp': NOW - 10}),
+    'exp_now': _token({**VALID, 'exp': NOW}),
+    'exp_float': _token({**VALID, 'exp': NOW + 3600.5}),
+    'exp_bool': _token({**VALID, 'exp': True}),
+    'exp_string': _token({**VALID, 'exp': str(NOW + 3600)}),
+    'iat_future': _token({**VALID, 'iat': NOW + 3600}),
+    'iat_string': _token({**VALID, 'iat': str(NOW)}),
+    'nbf_past': _token({**VALID, 'nbf': NOW - 10}),
+    'nbf_future': _token({**VALID, 'nbf': NOW + 3600}),
+    'aud': _token({**VALID, 'aud': 'api'}),
+    'iss': _token({**VALID, 'iss': 'issuer'}),
+    'bad_signature': _token(VALID, key=b'another-secret-key-with-at-least-32-bytes'),
+    'padded_signature': _token(VALID) + '=',
+    'empty_signature': _token(VALID, signature=b''),
+    'alg_none': _token(VALID, header={'alg': 'none', 'typ': 'JWT'}, signature=b''),
+    'alg_hs512': _token(VALID, header={'alg': 'HS512', 'typ': 'JWT'}),
+    'extra_header_kid': _token(VALID, header={'alg': 'HS256', 'typ': 'JWT', 'kid': 'k1'}),
+    'header_not_object': _token(VALID, header=b'["HS256"]'),
+    'payload_not_object': _token(b'[1, 2]'),
+    'payload_not_json': _token(b'not json'),
+    'non_ascii': _token(VALID) + 'é',
+    'non_ascii_payload': _token({**VALID, 'username': '用户'}),
+    'two_segments': _token(VALID).rpartition('.')[0],
+    'garbage': 'not-a-token',
+    'empty': '',
+}
+
+
+@pytest.mark.parametrize('token', PARITY_CASES.values(), ids=PARITY_CASES.keys())
+def test_hs256_verifier_matches_pyjwt(token):
+    expected = _outcome(lambda t: jwt.decode(t, SECRET, algorithms=['HS256']), token)
+    assert _outcome(_hs256_verifier(SECRET), token) == expected
+
+
+def test_hs256_verifier_accepts_generated_tokens(app):
+    with app.app_context():
+        access_token, _ = generate_tokens(5, 'bob')
+    secret = app.config['JWT_SECRET_KEY'].encode('utf-8')
+    assert _hs256_verifier(secret)(access_token) == jwt.decode(access_token, secret, algorithms=['HS256'])
@@ -0,0 +1,85 @@
+"""
+Tests for LLM stream decoding helpers.
+"""
+
+import asyncio
+
+import httpx
+
+from services.llm_service import DeepSeekClient, _AsyncClientPool, _DeltaBuffer, _split_lines
+
+
+def test_split_lines_keeps_unfinished_tail():
+    lines, pending = _split_lines(b'', b'data: a\n\ndata: b')
+    assert lines == [b'data: a', b'']
+    assert pending == b'data: b'
+    
+    lines, pending = _split_lines(pending, b'c\n')
+    assert lines == [b'data: bc']
+    assert pending == b''
+
+
+def test_delta_buffer_coalesces_until_flush(monkeypatch):
+    monkeypatch.setattr('services.llm_service.time.monotonic', lambda: 100.0)
+    deltas = _DeltaBuffer()
+    assert deltas.add("Hello") == "Hello"  # first delta goes out immediately
+    assert deltas.add(" wor") is None
+    assert deltas.add("ld") is None
+    assert deltas.flush() == " world"
+    assert deltas.flush() is None
+
+
+def test_delta_buffer_flushes_on_size():
+    deltas = _DeltaBuffer()
+    deltas.add("x")
+    text = "y" * _DeltaBuffer.FLUSH_CHARS
+    assert deltas.add(text) == text
+    assert deltas.add(None) is None
+
+
+def test_delta_buffer_flushes_on_interval(monkeypatch):
+    clock = iter([100.0, 100.03])
+    monkeypatch.setattr('services.llm_service.time.monotonic', lambda: next(clock))
+    deltas = _DeltaBuffer()
+    assert deltas.add("Hello") == "Hello"
+    assert deltas.add(" world") == " world"
+    assert deltas.flush() is None
+
+
+# Last event has no trailing newline, so it is parsed from the pending tail
+STREAM_BODY = (
+    b'data: {"choices":[{"delta":{"content":"Hello"}}]}\n\n'
+    b'data: {"choices":[{"delta":{"content":" world"}}]}'
+)
+
+
+def _stream_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=STREAM_BODY)
+
+
+def test_stream_keeps_tail_without_trailing_newline(monkeypatch):
+    monkeypatch.setattr(_DeltaBuffer, 'FLUSH_INTERVAL', 0.0)
+    client = DeepSeekClient(
+        'key',
+        http_client=httpx.Client(transport=httpx.MockTransport(_stream_handler))
+    )
+    
+    chunks = list(client.chat([{"role": "user", "content": "hi"}], stream=True))
+    
+    assert ''.join(chunks) == "Hello world"
+
+
+def test_async_stream_keeps_tail_without_trailing_newline(monkeypatch):
+    monkeypatch.setattr(_DeltaBuffer, 'FLUSH_INTERVAL', 0.0)
+    monkeypatch.setattr(
+        _AsyncClientPool,
+        '_new_client',
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(_stream_handler))
+    )
+    client = DeepSeekClient('key')
+    
+    async def collect():
+        stream = await client.chat_async([{"role": "user", "content": "hi"}], stream=True)
+        return [chunk async for chunk in stream]
+    
+    assert ''.join(asyncio.run(collect())) == "Hello world"
@@ -0,0 +1,37 @@
+"""
+Tests for the standardized API response helpers.
+"""
+
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from utils.response import _json_default, paginated_response, success_response
+
+
+def test_success_response_encodes_decimal_and_set():
+    response, status_code = success_response(
+        data={"score": Decimal("0.875"), "tags": {"pdf"}, "ids": frozenset([3])}
+    )
+    
+    assert status_code == 200
+    assert response.mimetype == 'application/json'
+    body = orjson.loads(response.get_data())
+    assert body["data"] == {"score": "0.875", "tags": ["pdf"], "ids": [3]}
+
+
+def test_paginated_response_encodes_decimal_and_set():
+    items = [{"id": 1, "size_mb": Decimal("1.50"), "labels": {"a"}}]
+    
+    response, status_code = paginated_response(items, page=1, per_page=10, total=1)
+    
+    assert status_code == 200
+    body = orjson.loads(response.get_data())
+    assert body["data"] == [{"id": 1, "size_mb": "1.50", "labels": ["a"]}]
+    assert body["pagination"]["total_pages"] == 1
+
+
+def test_json_default_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        _json_default(object())
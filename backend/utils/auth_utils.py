@@ -8,14 +8,143 @@ This module provides JWT-based authentication utilities including:
 """
 
 import jwt
-from datetime import datetime, timedelta
-from functools import wraps
-from typing import Optional, Tuple
+import orjson
+import hmac
+import time
+import base64
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Callable, Optional, Tuple
 
-from flask import request, g, current_app
+from flask import Flask, request, g, current_app
 
 from .response import error_response
 
+logger = logging.getLogger(__name__)
+
+_HS256 = ('HS256',)
+
+# Registered claims the HS256 fast path leaves to PyJWT's validation
+_DELEGATED_CLAIMS = frozenset({'nbf', 'aud', 'iss', 'sub', 'jti'})
+
+
+@dataclass(frozen=True)
+class _AuthSettings:
+    """JWT settings snapshotted from one app's config."""
+    secret_key: bytes  # bytes, so PyJWT skips its per-call encode
+    algorithm: str
+    algorithms: Tuple[str, ...]  # jwt.decode allow-list, built once
+    access_expires: int  # seconds
+    refresh_expires: int  # seconds
+
+
+def init_auth(app: Flask) -> None:
+    """
+    Load JWT settings from the app config into app.extensions['auth'].
+    
+    Settings are kept per app, so several apps in one process (e.g. tests
+    with different JWT_SECRET_KEYs) never sign with each other's secret.
+    Called from the app factory; functions below initialize current_app
+    lazily if it was not.
+    
+    Args:
+        app: Flask application
+    """
+    secret_key = app.config['JWT_SECRET_KEY']
+    algorithm = app.config['JWT_ALGORITHM']
+    settings = _AuthSettings(
+        secret_key=secret_key.encode('utf-8') if isinstance(secret_key, str) else secret_key,
+        algorithm=algorithm,
+        algorithms=(algorithm,),
+        access_expires=int(app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds()),
+        refresh_expires=int(app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds())
+    )
+    app.extensions['auth'] = settings
+    
+    # Build the HS256 fast path now rather than on the first request
+    if algorithm == 'HS256':
+        _hs256_verifier(settings.secret_key)
+
+
+def _get_settings() -> _AuthSettings:
+    """Get the current app's JWT settings, loading them on first use."""
+    settings = current_app.extensions.get('auth')
+    if settings is None:
+        init_auth(current_app)
+        settings = current_app.extensions['auth']
+    return settings
+
+
+def _b64url_decode(segment: bytes) -> bytes:
+    """Decode an unpadded base64url JWT segment."""
+    return base64.urlsafe_b64decode(segment + b'=' * (-len(segment) % 4))
+
+
+@lru_cache(maxsize=4)
+def _hs256_verifier(secret_key: bytes) -> Callable[[str], dict]:
+    """
+    Build a verifier for the HS256 tokens generate_tokens() issues.
+    
+    Built once per secret. It skips PyJWT's option parsing, algorithm
+    registry and per-call key preparation: the token is split once, the
+    signature checked with hmac.compare_digest and the segments parsed
+    with orjson. Anything it does not fully handle (other header fields,
+    a bad signature, expiry, nbf/aud/iss/sub/jti claims, malformed input)
+    is passed to jwt.decode, so results and exceptions match PyJWT exactly.
+    
+    Args:
+        secret_key: HMAC key bytes
+        
+    Returns:
+        Function mapping a token to its verified payload
+    """
+    local = threading.local()
+    
+    def sign(signing_input: bytes) -> bytes:
+        # Copying a keyed HMAC skips the key schedule (ipad/opad setup)
+        # that hmac.new() repeats; one template per thread
+        template = getattr(local, 'hmac', None)
+        if template is None:
+            template = local.hmac = hmac.new(secret_key, digestmod=hashlib.sha256)
+        mac = template.copy()
+        mac.update(signing_input)
+        return mac.digest()
+    
+    def verify(token: str) -> dict:
+        try:
+            signing_input, _, signature = token.encode('ascii').rpartition(b'.')
+            header_segment, _, payload_segment = signing_input.partition(b'.')
+            header = orjson.loads(_b64url_decode(header_segment))
+            
+            if (
+                isinstance(header, dict)
+                and header.get('alg') == 'HS256'
+                and header.keys() <= {'alg', 'typ'}
+                and hmac.compare_digest(
+                    sign(signing_input),
+                    _b64url_decode(signature)
+                )
+            ):
+                payload = orjson.loads(_b64url_decode(payload_segment))
+                if isinstance(payload, dict) and _DELEGATED_CLAIMS.isdisjoint(payload):
+                    now = time.time()
+                    exp, iat = payload.get('exp'), payload.get('iat')
+                    if (
+                        (exp is None or (type(exp) is int and exp > now))
+                        and (iat is None or (type(iat) is int and iat <= now))
+                    ):
+                        return payload
+        except ValueError:
+            # Covers non-ASCII tokens, bad base64 and JSON orjson rejects
+            pass
+        
+        return jwt.decode(token, secret_key, algorithms=_HS256)
+    
+    return verify
+
 
 def generate_tokens(user_id: int, username: str) -> Tuple[str, str]:
     """
@@ -28,68 +157,87 @@ def generate_tokens(user_id: int, username: str) -> Tuple[str, str]:
     Returns:
         Tuple of (access_token, refresh_token)
     """
-    # 使用 UTC 时间，JWT 标准要求
-    now = datetime.utcnow()
+    settings = _get_settings()
     
-    # Access token payload
-    access_payload = {
-        'user_id': user_id,
-        'username': username,
-        'type': 'access',
-        'iat': now,
-        'exp': now + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
-    }
+    # 使用 UTC 时间戳（整数秒），JWT 标准 (RFC 7519 NumericDate)
+    now = int(time.time())
     
     # Refresh token payload
     refresh_payload = {
         'user_id': user_id,
         'type': 'refresh',
         'iat': now,
-        'exp': now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+        'exp': now + settings.refresh_expires
+    }
+    
+    # Access token payload: the refresh claims plus the username
+    access_payload = {
+        **refresh_payload,
+        'username': username,
+        'type': 'access',
+        'exp': now + settings.access_expires
     }
     
     access_token = jwt.encode(
         access_payload,
-        current_app.config['JWT_SECRET_KEY'],
-        algorithm=current_app.config['JWT_ALGORITHM']
+        settings.secret_key,
+        algorithm=settings.algorithm
     )
     
     refresh_token = jwt.encode(
         refresh_payload,
-        current_app.config['JWT_SECRET_KEY'],
-        algorithm=current_app.config['JWT_ALGORITHM']
+        settings.secret_key,
+        algorithm=settings.algorithm
     )
     
     return access_token, refresh_token
 
 
+@lru_cache(maxsize=4096)
+def _decode_token_cached(token: str, secret_key: bytes, algorithms: Tuple[str, ...]) -> dict:
+    """
+    Verify a token once and remember its payload.
+    
+    The secret and algorithms are part of the cache key, so rotating the
+    key never serves payloads verified under the old one. Invalid tokens
+    raise and are not cached; expiry of cached tokens is checked by
+    decode_token() on every hit.
+    """
+    if algorithms == _HS256:
+        return _hs256_verifier(secret_key)(token)
+    return jwt.decode(token, secret_key, algorithms=algorithms)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """
     Decode and validate a JWT token.
     
+    Repeated tokens are served from an LRU cache of verified payloads,
+    skipping JSON parsing and signature verification.
+    
     Args:
         token: The JWT token string
         
     Returns:
         Decoded payload dict or None if invalid
     """
+    settings = _get_settings()
+    
     try:
-        # 确保 token 是干净的字符串
-        token = token.strip()
+        payload = _decode_token_cached(token, settings.secret_key, settings.algorithms)
+        if 'exp' in payload and payload['exp'] <= time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
         
-        payload = jwt.decode(
-            token,
-            current_app.config['JWT_SECRET_KEY'],
-            algorithms=[current_app.config['JWT_ALGORITHM']]
-        )
-        return payload
+        # Callers get their own copy; the cached payload is shared
+        return dict(payload)
     except jwt.ExpiredSignatureError:
-        current_app.logger.warning("Token has expired")
+        logger.warning("Token has expired")
         return None
     except jwt.InvalidTokenError as e:
         # 记录详细错误信息以便调试
-        current_app.logger.error(f"Invalid token error: {type(e).__name__}: {str(e)}")
-        current_app.logger.debug(f"Token (first 50 chars): {token[:50] if token else 'None'}...")
+        logger.error("Invalid token error: %s: %s", type(e).__name__, e)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Token (first 50 chars): %s...", token[:50] if token else 'None')
         return None
 
 
@@ -105,14 +253,21 @@ def get_token_from_request() -> Optional[str]:
         Token string or None if not found
     """
     # Check Authorization header
-    auth_header = request.headers.get('Authorization', '')
-    if auth_header.startswith('Bearer '):
+    # Read the WSGI environ directly rather than through the
+    # case-insensitive EnvironHeaders wrapper
+    environ = request.environ
+    
+    # Constant-time scheme check; header values are latin-1 decoded, and
+    # compare_digest only accepts ASCII str, so compare as bytes
+    auth_header = environ.get('HTTP_AUTHORIZATION', '')
+    if len(auth_header) >= 7 and hmac.compare_digest(auth_header[:7].encode('latin-1'), b'Bearer '):
         return auth_header[7:]
     
     # Check X-Access-Token header
-    token = request.headers.get('X-Access-Token')
+    token = environ.get('HTTP_X_ACCESS_TOKEN')
     if token:
-        return token
+        # 确保 token 是干净的字符串（自定义头可能带有空白或换行）
+        return token.strip()
     
     return None
 
@@ -134,35 +289,42 @@ def token_required(f):
             user_id = g.user_id  # Available after authentication
             return f"Hello, user {user_id}!"
     """
+    # Bind helpers as closure variables once per route (LOAD_DEREF per
+    # request instead of global lookups)
+    get_token, decode, error = get_token_from_request, decode_token, error_response
+    
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        token = get_token_from_request()
+        token = get_token()
         
         if not token:
-            return error_response(
+            return error(
                 message="Authentication required. Please provide a valid token.",
                 status_code=401
             )
         
-        payload = decode_token(token)
+        payload = decode(token)
         
         if not payload:
-            return error_response(
+            return error(
                 message="Invalid or expired token. Please login again.",
                 status_code=401
             )
         
         # Check token type
         if payload.get('type') != 'access':
-            return error_response(
+            return error(
                 message="Invalid token type. Access token required.",
                 status_code=401
             )
         
-        # Inject user info into Flask's g context
-        g.user_id = payload.get('user_id')
-        g.username = payload.get('username')
-        g.token_payload = payload
+        # Inject user info into Flask's g context (one dict merge instead
+        # of three __setattr__ calls)
+        g.__dict__.update(
+            user_id=payload.get('user_id'),
+            username=payload.get('username'),
+            token_payload=payload
+        )
         
         return f(*args, **kwargs)
     
@@ -175,32 +337,33 @@ def refresh_token_required(f):
     
     Similar to @token_required but validates refresh tokens instead.
     """
+    get_token, decode, error = get_token_from_request, decode_token, error_response
+    
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        token = get_token_from_request()
+        token = get_token()
         
         if not token:
-            return error_response(
+            return error(
                 message="Refresh token required.",
                 status_code=401
             )
         
-        payload = decode_token(token)
+        payload = decode(token)
         
         if not payload:
-            return error_response(
+            return error(
                 message="Invalid or expired refresh token.",
                 status_code=401
             )
         
         if payload.get('type') != 'refresh':
-            return error_response(
+            return error(
                 message="Invalid token type. Refresh token required.",
                 status_code=401
             )
         
-        g.user_id = payload.get('user_id')
-        g.token_payload = payload
+        g.__dict__.update(user_id=payload.get('user_id'), token_payload=payload)
         
         return f(*args, **kwargs)
     
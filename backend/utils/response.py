@@ -5,8 +5,57 @@ This module provides helper functions for creating consistent API responses
 across all endpoints.
 """
 
+from decimal import Decimal
+from functools import lru_cache
 from typing import Any, Dict, Optional
-from flask import jsonify
+
+import orjson
+from flask import Response, has_request_context, request
+
+
+@lru_cache(maxsize=1)
+def _load_msgpack():
+    """Import msgpack once, or None if it is not installed."""
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert values orjson and msgpack cannot encode natively."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_response(body: Dict, status_code: int) -> tuple:
+    """
+    Serialize a response body with orjson, or msgpack when asked for.
+    
+    orjson encodes straight to UTF-8 bytes in C, several times faster
+    than jsonify's stdlib encoder on large list payloads. Non-string
+    dict keys are stringified and Decimals become strings, as jsonify
+    does; sets become lists. Service clients that
+    prefer "Accept: application/msgpack" get a smaller binary body when
+    msgpack is installed; browsers keep getting JSON.
+    """
+    msgpack = None
+    if has_request_context() and request.accept_mimetypes.best == 'application/msgpack':
+        msgpack = _load_msgpack()
+    
+    if msgpack is not None:
+        payload = msgpack.packb(body, default=_json_default, use_bin_type=True)
+        response = Response(payload, status=status_code, mimetype='application/msgpack')
+    else:
+        payload = orjson.dumps(body, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        response = Response(payload, status=status_code, mimetype='application/json')
+    
+    response.vary.add('Accept')
+    return response, status_code
 
 
 def success_response(
@@ -32,8 +81,9 @@ def success_response(
         "message": message,
         "data": data
     }
-    response.update(kwargs)
-    return jsonify(response), status_code
+    if kwargs:
+        response.update(kwargs)
+    return _json_response(response, status_code)
 
 
 def error_response(
@@ -59,8 +109,9 @@ def error_response(
         "message": message,
         "errors": errors
     }
-    response.update(kwargs)
-    return jsonify(response), status_code
+    if kwargs:
+        response.update(kwargs)
+    return _json_response(response, status_code)
 
 
 def paginated_response(
@@ -83,7 +134,7 @@ def paginated_response(
     Returns:
         Tuple of (response_json, status_code)
     """
-    total_pages = (total + per_page - 1) // per_page if per_page > 0 else 0
+    total_pages = -(-total // per_page) if per_page > 0 else 0  # ceiling division
     
     return success_response(
         data=items,